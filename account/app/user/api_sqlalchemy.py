@@ -6,9 +6,73 @@ __date__ = "2022/8/26 上午11:21"
 
 from trit.db.sqlalchemy import api as sa_api
 
+from account.comment import api as common_api
+from account.comment import cache
+from account.db import models as db_models
+
 from . import models
 
 
 def get_public_cloud_list():
     data = sa_api.get_session().query(models.PublicCloud).all()
     return data
+
+
+@cache.cached(models.Role)
+def get_role_list(hints=None):
+    query = common_api.model_query(models.Role)
+    return list(common_api.filter_limit_query_with_offset(
+        models.Role, query, hints))
+
+
+@cache.cached(models.Permission)
+def get_permission_list(hints=None):
+    query = common_api.model_query(models.Permission, has_deleted_col=False)
+    return list(common_api.filter_limit_query_with_offset(
+        models.Permission, query, hints))
+
+
+@cache.cached(models.RolePermission)
+def get_role_permission_list(hints=None):
+    query = common_api.model_query(models.RolePermission,
+                                   has_deleted_col=False)
+    return list(common_api.filter_limit_query_with_offset(
+        models.RolePermission, query, hints))
+
+
+@cache.cached(models.Resource)
+def get_resource_list(hints=None):
+    query = common_api.model_query(models.Resource, has_deleted_col=False)
+    return list(common_api.filter_limit_query_with_offset(
+        models.Resource, query, hints))
+
+
+# Columns never exported
+USER_EXPORT_EXCLUDE = ('password',)
+
+
+def export_user_columns():
+    return db_models.column_accessor(models.User, USER_EXPORT_EXCLUDE)[0]
+
+
+def export_user_quota_bill_columns():
+    return db_models.column_accessor(models.UserQuotaBill)[0]
+
+
+def stream_users(hints=None):
+    """Yields the users as dicts, without their password hash."""
+    query = common_api.model_query(models.User)
+    query = common_api.filter_limit_query_with_offset(models.User, query,
+                                                      hints)
+    return common_api.stream_dicts(models.User, query, export_user_columns())
+
+
+def stream_user_quota_bills(hints=None, period=None):
+    """Yields the bills as dicts, those created within period if given,
+    reading only the partitions overlapping it, see comment/partition.py.
+    """
+    query = common_api.model_query(models.UserQuotaBill,
+                                   has_deleted_col=False, period=period)
+    query = common_api.filter_limit_query_with_offset(models.UserQuotaBill,
+                                                      query, hints)
+    return common_api.stream_dicts(models.UserQuotaBill, query)
@@ -0,0 +1,176 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Login of users with their username and password.
+
+The password is verified in the hashing pool of the worker, see
+account/comment/hashing.py, so logins never stall the event loop.  After
+``LOGIN_CHANCES`` failed attempts the user is locked for ``lock_interval``
+seconds.
+
+Unknown usernames cost a password verification as well, against a dummy
+hash, and a lock is only told to whoever gave the right password, so that
+neither the timing nor the error of a login reveals which users exist.
+
+Attempts are counted in Redis, see throttle.py, and the user row is only
+written when its state changes: the user gets locked, logs in again after
+failures, or its ``last_login`` is older than
+``[identity] login_last_seen_interval``.  Without Redis, or if it fails,
+every attempt is recorded on the user row instead.
+
+Successful logins are recorded in user_login by login_recorder.py.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午5:10"
+
+import datetime
+import logging
+
+from oslo_utils import importutils
+from oslo_utils import timeutils
+from sqlalchemy import select
+from sqlalchemy import update
+
+from account.comment import async_api
+from account.comment import exception
+from account.comment import hashing
+
+from . import login_recorder
+from . import models
+from . import throttle as login_throttle
+
+redis = importutils.try_import('redis')
+
+LOG = logging.getLogger(__name__)
+
+# Failed attempts allowed before locking, the login_chance column default
+LOGIN_CHANCES = 5
+
+# Verified against when the user does not exist, built on first use.
+_DUMMY_HASH = None
+
+
+async def _dummy_hash():
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = await hashing.hash_password('dummy password')
+    return _DUMMY_HASH
+
+
+def _retry_in(user, now):
+    """Seconds the user row says it stays locked, 0 if not locked."""
+    if user.state != 'locked' or user.lock_datetime is None:
+        return 0
+    until = user.lock_datetime + datetime.timedelta(
+        seconds=user.lock_interval or 0)
+    return max(0, int((until - now).total_seconds()))
+
+
+async def _update_user(session, user, **values):
+    table = models.User.__table__
+    await session.execute(
+        update(table).where(table.c.id == user.id).values(**values))
+    await session.commit()
+
+
+async def _row_succeeded(session, user, now, ipaddr):
+    await _update_user(session, user, login_chance=LOGIN_CHANCES,
+                       state='active', lock_datetime=None, last_login=now,
+                       ipaddr=ipaddr)
+
+
+async def _row_failed(session, user, now):
+    # Decremented by the database, concurrent failures would all write the
+    # same value otherwise.  The UPDATE keeps the row locked until the
+    # commit, so the value read back is the one it wrote.
+    table = models.User.__table__
+    await session.execute(
+        update(table).where(table.c.id == user.id).values(
+            login_chance=table.c.login_chance - 1, last_retry=now))
+    chances = (await session.execute(
+        select(table.c.login_chance).where(table.c.id == user.id))).scalar()
+    if chances is not None and chances <= 0:
+        await session.execute(
+            update(table).where(table.c.id == user.id).values(
+                state='locked', lock_datetime=now,
+                login_chance=LOGIN_CHANCES))
+    await session.commit()
+
+
+async def _succeeded(session, throttle, user, now, ipaddr):
+    if throttle is None:
+        return await _row_succeeded(session, user, now, ipaddr)
+    try:
+        had_failures, seen = await throttle.succeeded(user)
+    except redis.RedisError:
+        LOG.warning('Login throttle unavailable, recording the login of '
+                    '%s on its row', user.username, exc_info=True)
+        return await _row_succeeded(session, user, now, ipaddr)
+
+    values = {}
+    if (had_failures or user.state == 'locked' or
+            user.login_chance != LOGIN_CHANCES):
+        values.update(login_chance=LOGIN_CHANCES, state='active',
+                      lock_datetime=None)
+    if seen:
+        values.update(last_login=now, ipaddr=ipaddr)
+    if values:
+        await _update_user(session, user, **values)
+
+
+async def _failed(session, throttle, user, now):
+    """Records a failed attempt."""
+    if throttle is None:
+        return await _row_failed(session, user, now)
+    try:
+        _retry_in, locked_now = await throttle.failed(user, LOGIN_CHANCES)
+    except redis.RedisError:
+        LOG.warning('Login throttle unavailable, recording the failed login '
+                    'of %s on its row', user.username, exc_info=True)
+        return await _row_failed(session, user, now)
+    if locked_now:
+        await _update_user(session, user, state='locked', lock_datetime=now,
+                           last_retry=now)
+
+
+async def authenticate(username, password, ipaddr=None):
+    """Checks the credentials of a user and records the attempt.
+
+    :returns: the user
+    :raise exception.AuthenticationFailed: unknown user or wrong password
+    :raise exception.UserLocked: right password, but too many failed
+                                 attempts lately
+    """
+    throttle = login_throttle.get_throttle()
+    async with async_api.get_session() as session:
+        query = async_api.model_query(models.User).filter(
+            models.User.username == username)
+        user = (await session.execute(query)).scalars().first()
+        if user is None:
+            # As slow as for an existing user
+            await hashing.check_password(password, await _dummy_hash())
+            raise exception.AuthenticationFailed()
+
+        now = timeutils.utcnow()
+        # The row lock also covers locks set by administrators.
+        retry_in = _retry_in(user, now)
+        if not retry_in and throttle is not None:
+            try:
+                retry_in = await throttle.locked(user)
+            except redis.RedisError:
+                LOG.warning('Login throttle unavailable', exc_info=True)
+
+        valid = await hashing.check_password(password, user.password)
+        if retry_in:
+            if valid:
+                raise exception.UserLocked(username=username,
+                                           retry_in=retry_in)
+            # Not counted, the user is locked already.
+            raise exception.AuthenticationFailed()
+        if valid:
+            await _succeeded(session, throttle, user, now, ipaddr)
+            login_recorder.record(user.uuid, ipaddr=ipaddr)
+            return user
+        await _failed(session, throttle, user, now)
+    raise exception.AuthenticationFailed()
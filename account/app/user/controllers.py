@@ -4,13 +4,41 @@
 __author__ = "SYK"
 __date__ = "2023/4/11 下午11:47"
 
+import datetime
 import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+from fastapi import Body
+from fastapi import Depends
+from fastapi import Request
+from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBasic
+from fastapi.security import HTTPBasicCredentials
+from starlette.concurrency import run_in_threadpool
+from oslo_config import cfg
 from trit.core.events import event_handler, bus_event_handler
 
+from account.comment import async_api
+from account.comment import driver_hints
+from account.comment import exception
+from account.comment import export
+
+from . import active_users
 from . import api_sqlalchemy as db_api
+from . import auth
+from . import importer
+from . import models
+from . import permissions
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
+_BASIC_AUTH = HTTPBasic()
+
 
 def index():
     return 'this is index'
@@ -25,6 +53,150 @@ def list_cloud():
     return cloud_list
 
 
+async def list_roles(sort_key: str = None, sort_dir: str = None,
+                     limit: int = None, offset: int = None):
+    hints = driver_hints.Hints()
+    hints.set_sort(None, sort_key, sort_dir)
+    if limit:
+        hints.set_limit(limit)
+    if offset:
+        hints.add_filter('offset', offset)
+    async with async_api.get_session() as session:
+        query = async_api.model_query(models.Role)
+        roles = await async_api.filter_limit_query_with_offset(
+            models.Role, query, hints, session)
+    return [role.to_dict() for role in roles]
+
+
+async def login(request: Request, username: str = Body(...),
+                password: str = Body(...)):
+    client = request.client.host if request.client else None
+    user = await auth.authenticate(username, password, ipaddr=client)
+    user = user.to_dict()
+    user.pop('password', None)
+    return user
+
+
+def _count_active_users(start, end):
+    if start is None and end is None:
+        return {'dau': active_users.dau(),
+                'wau': active_users.wau(),
+                'mau': active_users.mau()}
+    start = start or end
+    end = end or start
+    return {'start': start, 'end': end,
+            'active_users': active_users.count(start, end)}
+
+
+async def count_active_users(request: Request,
+                             credentials: HTTPBasicCredentials = Depends(
+                                 _BASIC_AUTH),
+                             start: datetime.date = None,
+                             end: datetime.date = None):
+    """Distinct users active from start to end (days, included), or the
+    DAU, WAU and MAU of today without a range.
+
+    Needs the permissions.ACTIVE_USERS permission.
+    """
+    await _authorize(request, credentials, permissions.ACTIVE_USERS)
+    return await run_in_threadpool(_count_active_users, start, end)
+
+
+def _export_hints(sort_key, sort_dir):
+    hints = driver_hints.Hints()
+    hints.set_sort(None, sort_key, sort_dir)
+    return hints
+
+
+def _export_response(rows, columns, fmt, name):
+    return StreamingResponse(
+        export.serialize(rows, columns, fmt),
+        media_type=export.MEDIA_TYPES[fmt],
+        headers={'Content-Disposition':
+                 'attachment; filename="%s.%s"' % (name, fmt)})
+
+
+async def _authorize(request, credentials, permission):
+    """Authenticates the caller, raises NoPermission without permission."""
+    client = request.client.host if request.client else None
+    user = await auth.authenticate(credentials.username,
+                                   credentials.password, ipaddr=client)
+    if not permissions.has_permission(user, permission):
+        raise exception.NoPermission(perm=permission)
+
+
+async def export_users(request: Request,
+                       credentials: HTTPBasicCredentials = Depends(
+                           _BASIC_AUTH),
+                       fmt: str = 'ndjson', sort_key: str = None,
+                       sort_dir: str = None):
+    """Streams every user as NDJSON or CSV, see comment/export.py.
+
+    Needs the permissions.EXPORT_USERS permission.
+    """
+    export.check_format(fmt)
+    await _authorize(request, credentials, permissions.EXPORT_USERS)
+    rows = db_api.stream_users(_export_hints(sort_key, sort_dir))
+    return _export_response(rows, db_api.export_user_columns(), fmt,
+                            'users')
+
+
+async def export_user_quota_bills(request: Request,
+                                  credentials: HTTPBasicCredentials = Depends(
+                                      _BASIC_AUTH),
+                                  fmt: str = 'ndjson', sort_key: str = None,
+                                  sort_dir: str = None,
+                                  start: datetime.datetime = None,
+                                  end: datetime.datetime = None):
+    """Streams the bills created from start to end (excluded), both
+    optional.
+
+    Needs the permissions.EXPORT_USER_QUOTA_BILLS permission.
+    """
+    export.check_format(fmt)
+    await _authorize(request, credentials,
+                     permissions.EXPORT_USER_QUOTA_BILLS)
+    period = (start, end) if start or end else None
+    rows = db_api.stream_user_quota_bills(_export_hints(sort_key, sort_dir),
+                                          period)
+    return _export_response(rows, db_api.export_user_quota_bill_columns(),
+                            fmt, 'user_quota_bills')
+
+
+class _RejectedRows(list):
+
+    def writerow(self, values):
+        self.append(dict(zip(importer.rejected_header(), values)))
+
+
+def _import_file(file):
+    suffix = os.path.splitext(file.filename or '')[1] or '.csv'
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        shutil.copyfileobj(file.file, f)
+        f.flush()
+        rejected = _RejectedRows()
+        report = importer.UserImporter(
+            workers=CONF.identity.import_hash_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+        ).run(importer.read_rows(f.name), rejected)
+    result = report.to_dict()
+    result['rejected_rows'] = rejected
+    return result
+
+
+async def import_users(request: Request, file: UploadFile,
+                       credentials: HTTPBasicCredentials = Depends(
+                           _BASIC_AUTH)):
+    """Bulk imports the users of an uploaded CSV or XLSX file.
+
+    Needs the permissions.IMPORT_USERS permission.  The import runs in the
+    threadpool, the hashing in a small pool of spawned processes, see
+    importer.py.
+    """
+    await _authorize(request, credentials, permissions.IMPORT_USERS)
+    return await run_in_threadpool(_import_file, file)
+
+
 @event_handler('order.submit')
 def notify_order_event(body, message):
     print('RECEIVED MESSAGE: {0!r}'.format(body))
@@ -39,3 +211,31 @@ def notify_order_bus_event(body, message):
 
     LOG.info(body)
     LOG.info(message)
+
+
+@bus_event_handler('permission_create')
+def notify_permission_create_bus_event(body, message):
+    permissions.get_index().add_permission(int(body['id']),
+                                           body['permission_name'])
+
+
+@bus_event_handler('role_permission_grant')
+def notify_role_permission_grant_bus_event(body, message):
+    permissions.get_index().grant(int(body['role_id']),
+                                  int(body['permission_id']))
+
+
+@bus_event_handler('role_permission_revoke')
+def notify_role_permission_revoke_bus_event(body, message):
+    permissions.get_index().revoke(int(body['role_id']),
+                                   int(body['permission_id']))
+
+
+@bus_event_handler('role_delete')
+def notify_role_delete_bus_event(body, message):
+    permissions.get_index().remove_role(int(body['id']))
+
+
+@bus_event_handler('permission_reload')
+def notify_permission_reload_bus_event(body, message):
+    permissions.get_index().load()
@@ -0,0 +1,380 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Bulk import of users from a CSV or XLSX file.
+
+The file is read as a stream, one row per user, with a header row naming
+the columns of :data:`COLUMNS`.  Rows are handled ``chunk_size`` at a time:
+
+* rows missing a required column, or whose username, email or career_id
+  is already taken, whatever its case (in the file or in the database,
+  checked with one ``IN`` query per column and chunk), or with a role_id
+  not in ``[identity] import_role_ids``, are rejected,
+* passwords are hashed in a process pool, while the previous chunk is
+  being inserted.  The command line uses every core, the API
+  ``[identity] import_hash_workers`` spawned processes,
+* the accepted rows are inserted with a multi-row INSERT, one transaction
+  per chunk.  Rows of a chunk hitting a constraint anyway, because of a
+  concurrent writer, are inserted one by one so only the culprits are
+  rejected.
+
+Rejected rows are written to a CSV file with their line number and the
+reason.  From the command line::
+
+    account-user-import --config-file /etc/account/account.conf \\
+        --rejected rejected.csv users.xlsx
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午4:05"
+
+import argparse
+import concurrent.futures
+import csv
+import functools
+import itertools
+import logging
+import os
+import time
+import uuid
+
+from oslo_config import cfg
+from oslo_db import exception as db_exc
+from oslo_utils import importutils
+from oslo_utils import timeutils
+from sqlalchemy import exc as sa_exc
+
+from account.comment import api as common_api
+from account.comment import cache
+from account.comment import exception
+from account.comment import utils
+from account.comment.i18n import _
+
+from . import models
+
+openpyxl = importutils.try_import('openpyxl')
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+COLUMNS = ('username', 'password', 'cellphone', 'email', 'career_id',
+           'real_name', 'gender', 'college', 'specialty', 'grade_name',
+           'school', 'class_name', 'role_id')
+REQUIRED_COLUMNS = ('username', 'password', 'cellphone', 'email')
+UNIQUE_COLUMNS = ('username', 'email', 'career_id')
+INTEGER_COLUMNS = ('gender', 'role_id')
+
+
+class ImportReport(object):
+    """Progress, then outcome, of an import."""
+
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.started = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def to_dict(self):
+        return {'read': self.read,
+                'imported': self.imported,
+                'rejected': self.rejected,
+                'elapsed': round(self.elapsed, 3)}
+
+
+def _read_csv(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            yield row
+
+
+def _read_xlsx(path):
+    if openpyxl is None:
+        raise exception.InvalidInput(
+            reason=_('Importing XLSX files requires openpyxl'))
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name).strip() if name is not None else ''
+                  for name in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def read_rows(path):
+    """Yields (line number, row) of a CSV or XLSX file, header excluded."""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        rows = _read_xlsx(path)
+    else:
+        rows = _read_csv(path)
+    return zip(itertools.count(2), rows)
+
+
+def _normalize(row):
+    """Returns the user values of a row, raises ValueError if invalid."""
+    values = {}
+    for name in COLUMNS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            if name in REQUIRED_COLUMNS:
+                raise ValueError("missing %s" % name)
+            continue
+        if name in INTEGER_COLUMNS:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError("%s is not an integer" % name)
+        else:
+            value = str(value)
+            column = models.User.__table__.c[name]
+            length = getattr(column.type, 'length', None)
+            if length is not None and len(value) > length:
+                raise ValueError("%s longer than %d" % (name, length))
+        values[name] = value
+    return values
+
+
+def _fold(value):
+    """Key of a unique value, case insensitive like the MySQL collations
+    the database compares them with.
+    """
+    return value.lower() if isinstance(value, str) else value
+
+
+def _hash(password, rounds):
+    return utils.hash_password(password, rounds=rounds)
+
+
+class UserImporter(object):
+    """Imports users, see the module documentation.
+
+    :param chunk_size: rows validated, hashed and inserted together
+    :param workers: hashing processes, defaults to the number of CPUs
+    :param progress: callable receiving the ImportReport after each chunk
+    :param mp_context: multiprocessing context of the hashing processes,
+                       ``spawn`` in the API, whose workers are not to be
+                       forked with their threads and connections
+    :param role_ids: role_id values the users may get, defaults to
+                     ``[identity] import_role_ids``
+    """
+
+    def __init__(self, chunk_size=1000, workers=None, progress=None,
+                 engine=None, mp_context=None, role_ids=None):
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.mp_context = mp_context
+        if role_ids is None:
+            role_ids = CONF.identity.import_role_ids
+        self.role_ids = frozenset(role_ids)
+        self.progress = progress
+        self._engine = engine
+        # Unique values seen in the file so far, by column
+        self._seen = {name: set() for name in UNIQUE_COLUMNS}
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = common_api.get_engine()
+        return self._engine
+
+    def _taken(self, conn, chunk):
+        """Returns the unique values of a chunk already in the database."""
+        table = models.User.__table__
+        taken = {}
+        for name in UNIQUE_COLUMNS:
+            values = {values[name] for _line, _row, values in chunk
+                      if values.get(name) is not None}
+            if not values:
+                taken[name] = set()
+                continue
+            column = table.c[name]
+            query = (table.select().with_only_columns([column])
+                     .where(column.in_(values))
+                     .where(table.c.deleted == False))  # noqa: E712
+            taken[name] = {_fold(value) for value, in conn.execute(query)}
+        return taken
+
+    def _validate(self, rows, reject):
+        """Returns the acceptable (line, row, values) of the rows."""
+        chunk = []
+        for line, row in rows:
+            try:
+                values = _normalize(row)
+            except ValueError as e:
+                reject(line, row, str(e))
+                continue
+            role_id = values.get('role_id')
+            if role_id is not None and role_id not in self.role_ids:
+                reject(line, row, "role_id %s may not be imported" % role_id)
+                continue
+            chunk.append((line, row, values))
+        if not chunk:
+            return chunk
+
+        with self.engine.connect() as conn:
+            taken = self._taken(conn, chunk)
+
+        accepted = []
+        for line, row, values in chunk:
+            error = None
+            for name in UNIQUE_COLUMNS:
+                value = values.get(name)
+                if value is None:
+                    continue
+                if _fold(value) in taken[name]:
+                    error = "%s %s already exists" % (name, value)
+                elif _fold(value) in self._seen[name]:
+                    error = "duplicate %s %s in file" % (name, value)
+                if error:
+                    break
+            if error:
+                reject(line, row, error)
+                continue
+            for name in UNIQUE_COLUMNS:
+                if values.get(name) is not None:
+                    self._seen[name].add(_fold(values[name]))
+            accepted.append((line, row, values))
+        return accepted
+
+    def _insert(self, chunk, hashes, reject):
+        """Inserts a chunk in one transaction, returns the rows inserted."""
+        now = timeutils.utcnow()
+        users = []
+        for (_line, _row, values), password in zip(chunk, hashes):
+            user = dict.fromkeys(COLUMNS)
+            user.update(values, uuid=uuid.uuid4().hex, password=password,
+                        state='active', created_at=now, deleted=False)
+            users.append(user)
+        if not users:
+            return 0
+
+        table = models.User.__table__
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(table.insert(), users)
+            return len(users)
+        except (db_exc.DBDuplicateEntry, sa_exc.IntegrityError):
+            LOG.warning('Chunk of %d users conflicts with concurrent '
+                        'writes, inserting them one by one', len(users))
+
+        inserted = 0
+        for (line, row, _values), user in zip(chunk, users):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(table.insert(), user)
+                inserted += 1
+            except (db_exc.DBDuplicateEntry, sa_exc.IntegrityError) as e:
+                reject(line, row, "conflict: %s" % e)
+        return inserted
+
+    def run(self, rows, rejected_writer=None):
+        """Imports (line number, row) pairs.
+
+        :param rejected_writer: csv.writer the rejected rows are written
+                                to, as line, error and then COLUMNS
+        :returns: the ImportReport
+        """
+        report = ImportReport()
+
+        def reject(line, row, error):
+            report.rejected += 1
+            if rejected_writer is not None:
+                rejected_writer.writerow(
+                    [line, error] + [row.get(name) for name in COLUMNS
+                                     if name != 'password'])
+
+        rounds = CONF.identity.password_hash_rounds
+        hash_one = functools.partial(_hash, rounds=rounds)
+        pending = None
+        with concurrent.futures.ProcessPoolExecutor(
+                self.workers, mp_context=self.mp_context) as pool:
+            rows = iter(rows)
+            while True:
+                batch = list(itertools.islice(rows, self.chunk_size))
+                report.read += len(batch)
+                chunk = self._validate(batch, reject) if batch else None
+                # Hash this chunk while the previous one is inserted.
+                if chunk:
+                    hashes = pool.map(
+                        hash_one, [values['password']
+                                   for _line, _row, values in chunk],
+                        chunksize=max(1, len(chunk) // (self.workers * 4)))
+                if pending is not None:
+                    report.imported += self._insert(*pending, reject=reject)
+                    if self.progress is not None:
+                        self.progress(report)
+                pending = (chunk, hashes) if chunk else None
+                if not batch:
+                    break
+
+        cache.invalidate(models.User.__table__.name)
+        return report
+
+
+def rejected_header():
+    return ['line', 'error'] + [name for name in COLUMNS
+                                if name != 'password']
+
+
+def import_file(path, rejected_path=None, **kwargs):
+    """Imports the users of a CSV or XLSX file.
+
+    :param rejected_path: CSV file the rejected rows are written to
+    :returns: the ImportReport
+    """
+    importer = UserImporter(**kwargs)
+    if rejected_path is None:
+        return importer.run(read_rows(path))
+    with open(rejected_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(rejected_header())
+        return importer.run(read_rows(path), writer)
+
+
+def _register_opts():
+    from account.settings import FILE_OPTIONS
+
+    for group, opts in FILE_OPTIONS.items():
+        for opt in opts:
+            try:
+                CONF.register_opt(opt, group)
+            except cfg.DuplicateOptError:
+                # Options oslo.db already registered, like connection.
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Bulk import users from a CSV or XLSX file.')
+    parser.add_argument('path', help='CSV or XLSX file, with a header row')
+    parser.add_argument('--config-file', action='append', default=[])
+    parser.add_argument('--rejected', default='rejected.csv',
+                        help='CSV file the rejected rows are written to')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Hashing processes, defaults to the CPUs')
+    args = parser.parse_args()
+
+    _register_opts()
+    CONF(list(itertools.chain.from_iterable(
+        ('--config-file', f) for f in args.config_file)), project='account')
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    def progress(report):
+        LOG.info('%(read)d read, %(imported)d imported, %(rejected)d '
+                 'rejected, %(elapsed).1fs', report.to_dict())
+
+    report = import_file(args.path, args.rejected,
+                         chunk_size=args.chunk_size, workers=args.workers,
+                         progress=progress)
+    LOG.info('Done: %(read)d read, %(imported)d imported, %(rejected)d '
+             'rejected in %(elapsed).1fs', report.to_dict())
+    if report.rejected:
+        LOG.info('Rejected rows written to %s', args.rejected)
@@ -0,0 +1,320 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Write-behind recording of user_login rows.
+
+Logins only append their record to an in-process buffer.  A background
+thread writes the buffer with one multi-row INSERT when
+``[identity] login_record_batch_size`` records are queued, or
+``login_record_flush_interval`` seconds after the previous write, and once
+more when the process exits.
+
+The buffer holds ``login_record_queue_size`` records at most.  When the
+database falls behind, further records are dropped, or with
+``login_record_overflow = spill`` appended to a file that is written to the
+database once the buffer is drained.  The file is shared by the workers,
+which flock it to append to it or take it for replay; lines which cannot be
+read back are moved to ``<spill file>.rejected``.
+
+Every login is also added to the active user counters as it is recorded,
+dropped or not, see active_users.py.
+
+:meth:`LoginRecorder.stats` gives the queue depth, counters and flush
+latency histogram.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午6:20"
+
+import atexit
+import bisect
+import collections
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_utils import timeutils
+
+from account.comment import api as common_api
+from account.comment import metrics
+from account.comment import retry
+
+from . import active_users
+from . import models
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+
+def _spill_path():
+    return (CONF.identity.login_record_spill_path or
+            os.path.join(tempfile.gettempdir(), 'account-user-login.spill'))
+
+
+class LoginRecorder(object):
+    """Buffers user_login records and writes them in batches.
+
+    Unset parameters default to the ``[identity] login_record_*`` options.
+    """
+
+    def __init__(self, engine=None, queue_size=None, batch_size=None,
+                 flush_interval=None, overflow=None, spill_path=None):
+        self._engine = engine
+        self.queue_size = queue_size or CONF.identity.login_record_queue_size
+        self.batch_size = batch_size or CONF.identity.login_record_batch_size
+        self.flush_interval = (flush_interval or
+                               CONF.identity.login_record_flush_interval)
+        self.overflow = overflow or CONF.identity.login_record_overflow
+        self.spill_path = spill_path or _spill_path()
+
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread_pid = None
+        self._stopped = False
+
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed_flushes = 0
+        self.flush_latency_buckets = [0] * len(retry.LATENCY_BUCKETS)
+        self.flush_latency_sum = 0.0
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = common_api.get_engine()
+        return self._engine
+
+    def record(self, user_uuid, ipaddr=None, location=None):
+        """Queues a login, never blocks on the database."""
+        if ipaddr is not None:
+            # The column is sized for IPv4, a longer value would fail the
+            # whole batch.
+            ipaddr = ipaddr[:models.UserLogin.ipaddr.type.length]
+        record = {'created_at': timeutils.utcnow(),
+                  'user_uuid': user_uuid,
+                  'ipaddr': ipaddr,
+                  'location': location}
+        try:
+            active_users.add([(user_uuid, record['created_at'])])
+        except Exception:
+            LOG.warning('Counting the active user %s failed', user_uuid,
+                        exc_info=True)
+        self._ensure_thread()
+        with self._cond:
+            self.recorded += 1
+            if len(self._queue) < self.queue_size:
+                self._queue.append(record)
+                if len(self._queue) >= self.batch_size:
+                    self._cond.notify()
+                return
+        self._overflow([record])
+
+    def _overflow(self, records):
+        if self.overflow != 'spill':
+            with self._cond:
+                self.dropped += len(records)
+            metrics.count_login_records('dropped', len(records))
+            LOG.warning('user_login buffer full, %d records dropped',
+                        len(records))
+            return
+        lines = []
+        for record in records:
+            record = dict(record)
+            record['created_at'] = record['created_at'].strftime(
+                _DATETIME_FORMAT)
+            lines.append(json.dumps(record) + '\n')
+        try:
+            with self._open_spill('a') as f:
+                f.write(''.join(lines))
+        except OSError:
+            LOG.exception('Spilling %d user_login records failed, they are '
+                          'dropped', len(records))
+            with self._cond:
+                self.dropped += len(records)
+            metrics.count_login_records('dropped', len(records))
+            return
+        with self._cond:
+            self.spilled += len(records)
+        metrics.count_login_records('spilled', len(records))
+
+    def _ensure_thread(self):
+        # The thread does not survive a fork, every worker runs its own.
+        if self._thread_pid == os.getpid():
+            return
+        with self._cond:
+            if self._thread_pid == os.getpid():
+                return
+            # Records queued before a fork are the parent's to write.
+            self._queue.clear()
+            thread = threading.Thread(target=self._run,
+                                      name='user-login-recorder',
+                                      daemon=True)
+            thread.start()
+            self._thread_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.batch_size and not self._stopped:
+                    self._cond.wait(self.flush_interval)
+                if self._stopped:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # Nothing restarts the thread before the next fork.
+                LOG.exception('Flushing the user_login records failed')
+
+    def _observe(self, elapsed):
+        self.flush_latency_buckets[bisect.bisect_left(retry.LATENCY_BUCKETS,
+                                                      elapsed)] += 1
+        self.flush_latency_sum += elapsed
+
+    def _write(self, records):
+        start = time.monotonic()
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(models.UserLogin.__table__.insert(), records)
+        except Exception:
+            LOG.exception('Writing %d user_login records failed',
+                          len(records))
+            with self._cond:
+                self.failed_flushes += 1
+            return False
+        with self._cond:
+            self.written += len(records)
+            self._observe(time.monotonic() - start)
+        metrics.count_login_records('written', len(records))
+        return True
+
+    def flush(self):
+        """Writes the buffered records, then the spilled ones if any."""
+        with self._flush_lock:
+            while True:
+                with self._cond:
+                    batch = [self._queue.popleft() for _i in
+                             range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    break
+                if not self._write(batch):
+                    self._requeue(batch)
+                    return
+            if self.overflow == 'spill':
+                self._replay_spill()
+
+    def _requeue(self, batch):
+        with self._cond:
+            room = self.queue_size - len(self._queue)
+            self._queue.extendleft(reversed(batch[:room]))
+        if batch[room:]:
+            self._overflow(batch[room:])
+
+    def _open_spill(self, mode):
+        """Opens the spill file, locked, None if there is none to read.
+
+        The file may be renamed for replay by another worker between the
+        open and the lock, it is opened again then.
+        """
+        while True:
+            try:
+                f = open(self.spill_path, mode)
+            except FileNotFoundError:
+                if mode != 'r':
+                    raise
+                return None
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                if (os.fstat(f.fileno()).st_ino ==
+                        os.stat(self.spill_path).st_ino):
+                    return f
+            except FileNotFoundError:
+                pass
+            except BaseException:
+                f.close()
+                raise
+            f.close()
+
+    def _reject(self, lines):
+        LOG.error('%d spilled user_login records cannot be read, moved to '
+                  '%s.rejected', len(lines), self.spill_path)
+        with open(self.spill_path + '.rejected', 'a') as f:
+            f.write(''.join(lines))
+
+    def _replay_spill(self):
+        # Renaming first lets a single worker replay a spill file shared by
+        # all of them, records spilled meanwhile go to a new file.  The lock
+        # waits for the appends in progress.
+        replay_path = '%s.%d.replay' % (self.spill_path, os.getpid())
+        f = self._open_spill('r')
+        if f is None:
+            return
+        with f:
+            os.rename(self.spill_path, replay_path)
+        records = []
+        rejected = []
+        with open(replay_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    record['created_at'] = timeutils.parse_strtime(
+                        record['created_at'], _DATETIME_FORMAT)
+                except (ValueError, KeyError, TypeError):
+                    rejected.append(line)
+                    continue
+                records.append(record)
+        if rejected:
+            self._reject(rejected)
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            if not self._write(batch):
+                self._overflow(records[start:])
+                break
+        os.unlink(replay_path)
+
+    def stop(self):
+        """Stops the thread and writes what is left, on shutdown."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return {'queue_depth': len(self._queue),
+                    'queue_size': self.queue_size,
+                    'recorded': self.recorded,
+                    'written': self.written,
+                    'dropped': self.dropped,
+                    'spilled': self.spilled,
+                    'failed_flushes': self.failed_flushes,
+                    'flush_latency_sum': self.flush_latency_sum,
+                    'flush_latency_buckets': list(zip(
+                        retry.LATENCY_BUCKETS,
+                        self.flush_latency_buckets))}
+
+
+_LOCK = threading.Lock()
+_RECORDER = None
+
+
+def get_recorder():
+    global _RECORDER
+    with _LOCK:
+        if _RECORDER is None:
+            _RECORDER = LoginRecorder()
+            atexit.register(_RECORDER.stop)
+        return _RECORDER
+
+
+def record(user_uuid, ipaddr=None, location=None):
+    get_recorder().record(user_uuid, ipaddr=ipaddr, location=location)
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+__author__ = "SYK"
+__date__ = "2026/10/17 上午10:12"
+
+from oslo_utils import timeutils
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, \
+    BigInteger, DECIMAL, Enum
+
+from account.db.models import BASE, satelliteBase, ExptPlatformBase
+
+
+class Role(BASE, satelliteBase):
+    """角色"""
+    __tablename__ = 'role'
+
+    deleted = Column(Integer, default=0)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    uuid = Column(String(32))
+    description = Column(Text)
+
+
+USER_STATES = ('active', 'locked', 'creating', 'deleting')
+
+
+class User(BASE, satelliteBase):
+    """用户"""
+    __tablename__ = 'user'
+    # Columns of the user_search_ft FULLTEXT index, see comment/search.py
+    __search_columns__ = ('username', 'real_name', 'email', 'cellphone',
+                          'career_id')
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(String(32), nullable=False)
+    username = Column(String(255), nullable=False)
+    password = Column(String(128), nullable=False)
+    cellphone = Column(String(25), nullable=False)
+    email = Column(String(255), nullable=False)
+    role_id = Column(Integer, ForeignKey('role.id'))
+    avatar = Column(Text)
+    career_id = Column(String(128))
+    real_name = Column(String(128))
+    gender = Column(Integer)
+    college = Column(String(255))
+    specialty = Column(String(255))
+    grade_name = Column(String(255))
+    school = Column(String(255))
+    class_name = Column(String(255))
+    state = Column(Enum(*USER_STATES), nullable=False)
+    last_login = Column(DateTime, default=lambda: timeutils.utcnow())
+    login_chance = Column(Integer, nullable=False, default=5)
+    lock_datetime = Column(DateTime)
+    last_retry = Column(DateTime)
+    ipaddr = Column(String(255))
+    lock_interval = Column(Integer, default=60 * 30)
+    desc = Column(Text)
+
+
+class UserLogin(BASE, ExptPlatformBase):
+    """用户登录记录"""
+    __tablename__ = 'user_login'
+    # Monthly partitions, see comment/partition.py
+    __partition_by__ = 'created_at'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    location = Column(String(32))
+    ipaddr = Column(String(15))
+    user_uuid = Column(String(32), ForeignKey('user.uuid'))
+
+
+class UserHistoryTrend(BASE, ExptPlatformBase):
+    """用户趋势 按天/周/月汇总"""
+    __tablename__ = 'user_history_trend'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    # Start of the bucket
+    date = Column(DateTime, nullable=False)
+    active_user = Column(Integer, nullable=False, default=0)
+    new_user = Column(Integer, default=0)
+    # TREND_DAILY, TREND_WEEKLY or TREND_MONTHLY, see trend.py
+    type = Column(Integer, nullable=False)
+
+
+class RollupWatermark(BASE, ExptPlatformBase):
+    """Last row of a table rolled up into user_history_trend."""
+    __tablename__ = 'rollup_watermark'
+
+    name = Column(String(64), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, onupdate=lambda: timeutils.utcnow())
+
+
+class Permission(BASE, ExptPlatformBase):
+    """权限 （角色+菜单）"""
+    __tablename__ = 'permission'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(255), nullable=False)
+    permission_name = Column(String(255), nullable=False)
+    description = Column(Text)
+
+
+class RolePermission(BASE, ExptPlatformBase):
+    __tablename__ = 'role_permission'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    role_id = Column(Integer, ForeignKey('role.id'), primary_key=True)
+    permission_id = Column(Integer, ForeignKey('permission.id'),
+                           primary_key=True)
+
+
+class Resource(BASE, ExptPlatformBase):
+    """配额 总配额"""
+    __tablename__ = 'resource'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    updated_at = Column(DateTime, onupdate=lambda: timeutils.utcnow())
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    uuid = Column(String(32))
+    resource = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False)
+    description = Column(Text)
+    total_quota = Column(DECIMAL(30, 2), default=0)
+    used_quota = Column(DECIMAL(30, 2), default=0)
+    unit = Column(String(10), nullable=False, default='default')
+
+
+class UserQuota(BASE, ExptPlatformBase):
+    """用户配额"""
+    __tablename__ = 'user_quota'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    updated_at = Column(DateTime, onupdate=lambda: timeutils.utcnow())
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    total = Column(DECIMAL(30, 2), default=0)
+    used = Column(DECIMAL(30, 2), default=0)
+    user_uuid = Column(String(32), nullable=False)
+    resource_id = Column(Integer, ForeignKey('resource.id'), nullable=False)
+
+
+class UserQuotaBill(BASE, ExptPlatformBase):
+    """用户使用配额时记录"""
+    __tablename__ = 'user_quota_bill'
+    # Monthly partitions, see comment/partition.py
+    __partition_by__ = 'created_at'
+
+    created_at = Column(DateTime, default=lambda: timeutils.utcnow())
+    updated_at = Column(DateTime, onupdate=lambda: timeutils.utcnow())
+    id = Column(BigInteger().with_variant(Integer, 'sqlite'),
+                primary_key=True, autoincrement=True)
+    total_new = Column(DECIMAL(30, 2), nullable=False, default=0)
+    state = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    user_quota_id = Column(String(32), nullable=False)
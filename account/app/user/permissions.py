@@ -0,0 +1,140 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""In-process role -> permission index.
+
+Every permission gets a bit, every role the bitmask of the permissions it
+holds, so answering "does this user have permission P" is a dict lookup and
+a bit test instead of a role/role_permission/permission join.
+
+The index is loaded once per worker and kept up to date from the
+``role_permission``/``permission`` events of the eventbus, see the
+``bus_event_handler`` functions in :mod:`account.app.user.controllers`.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 上午11:05"
+
+import logging
+import threading
+
+from . import api_sqlalchemy as db_api
+
+LOG = logging.getLogger(__name__)
+
+# permission_name of the exports, imports and reports of user data, see
+# controllers.py
+EXPORT_USERS = 'USER_EXPORT'
+EXPORT_USER_QUOTA_BILLS = 'USER_QUOTA_BILL_EXPORT'
+IMPORT_USERS = 'USER_IMPORT'
+ACTIVE_USERS = 'ACTIVE_USER_VIEW'
+
+
+class PermissionIndex(object):
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # permission id and permission_name -> bit
+        self._bits = {}
+        # role id -> bitmask of its permissions
+        self._masks = {}
+        self._next_bit = 0
+
+    def load(self):
+        """(Re)builds the whole index from the database.
+
+        Reads past the cache: a reload is asked for when the index, and
+        possibly the cache, went stale.
+        """
+        bits = {}
+        next_bit = 0
+        for perm in db_api.get_permission_list.uncached():
+            bits[perm.id] = next_bit
+            bits[perm.permission_name] = next_bit
+            next_bit += 1
+
+        masks = {}
+        for ref in db_api.get_role_permission_list.uncached():
+            bit = bits.get(ref.permission_id)
+            if bit is not None:
+                masks[ref.role_id] = masks.get(ref.role_id, 0) | (1 << bit)
+
+        with self._lock:
+            self._bits, self._masks = bits, masks
+            self._next_bit = next_bit
+        LOG.info('Permission index loaded: %d permissions, %d roles',
+                 next_bit, len(masks))
+
+    def add_permission(self, permission_id, permission_name):
+        with self._lock:
+            if permission_id in self._bits:
+                return
+            bits = dict(self._bits)
+            bits[permission_id] = self._next_bit
+            bits[permission_name] = self._next_bit
+            self._bits = bits
+            self._next_bit += 1
+
+    def grant(self, role_id, permission_id):
+        with self._lock:
+            bit = self._bits.get(permission_id)
+            if bit is None:
+                LOG.warning('Grant of unknown permission %s to role %s',
+                            permission_id, role_id)
+                return
+            masks = dict(self._masks)
+            masks[role_id] = masks.get(role_id, 0) | (1 << bit)
+            self._masks = masks
+
+    def revoke(self, role_id, permission_id):
+        with self._lock:
+            bit = self._bits.get(permission_id)
+            if bit is None or role_id not in self._masks:
+                return
+            masks = dict(self._masks)
+            masks[role_id] &= ~(1 << bit)
+            self._masks = masks
+
+    def remove_role(self, role_id):
+        with self._lock:
+            masks = dict(self._masks)
+            masks.pop(role_id, None)
+            self._masks = masks
+
+    def role_has_permission(self, role_id, permission):
+        """Checks a role against a permission id or permission_name."""
+        bit = self._bits.get(permission)
+        if bit is None:
+            return False
+        return bool(self._masks.get(role_id, 0) >> bit & 1)
+
+    def has_permission(self, user, permission):
+        """Checks a user (model or dict carrying role_id) against a permission.
+
+        The user is the already authenticated one, so the check never
+        touches the database.
+        """
+        if isinstance(user, dict):
+            role_id = user.get('role_id')
+        else:
+            role_id = getattr(user, 'role_id', None)
+        return self.role_has_permission(role_id, permission)
+
+
+_LOCK = threading.Lock()
+_INDEX = None
+
+
+def get_index():
+    """Returns the index of this worker, loading it on first use."""
+    global _INDEX
+    with _LOCK:
+        if _INDEX is None:
+            index = PermissionIndex()
+            index.load()
+            _INDEX = index
+        return _INDEX
+
+
+def has_permission(user, permission):
+    return get_index().has_permission(user, permission)
@@ -6,7 +6,8 @@ __date__ = "2022/8/26 下午2:00"
 
 
 from trit.core.resources.router import BaseAPIRouters
-from fastapi.routing import APIRoute as Route
+
+from account.comment.routing import InstrumentedRoute as Route
 
 from . import controllers
 
@@ -21,4 +22,12 @@ class APIRouters(BaseAPIRouters):
             Route(path='/', endpoint=controllers.index, methods=['GET']),
             Route(path='/test', endpoint=controllers.test, methods=['GET', 'POST']),
             Route(path='/list', endpoint=controllers.list_cloud, methods=['GET', 'POST']),
+            Route(path='/roles', endpoint=controllers.list_roles, methods=['GET']),
+            Route(path='/active_users', endpoint=controllers.count_active_users,
+                  methods=['GET']),
+            Route(path='/login', endpoint=controllers.login, methods=['POST']),
+            Route(path='/users/import', endpoint=controllers.import_users, methods=['POST']),
+            Route(path='/users/export', endpoint=controllers.export_users, methods=['GET']),
+            Route(path='/quota_bills/export', endpoint=controllers.export_user_quota_bills,
+                  methods=['GET']),
         ]
@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Login attempt throttling in Redis.
+
+Failed attempts of a user are counted in the Redis hash
+``{prefix}:login:{user id}``, which expires ``lock_interval`` seconds after
+the first failure.  The attempt reaching ``auth.LOGIN_CHANCES`` failures
+locks the user: the hash is flagged and its TTL reset to ``lock_interval``,
+so the lock lifts by itself when the key expires.  Each step is a single
+Lua script, atomic however many workers are hammering the same account.
+
+The user row is only written on transitions, see auth.py: when a user
+gets locked, when it logs in again after being locked, and to record
+``last_login`` at most once per ``[identity] login_last_seen_interval``.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午5:40"
+
+import asyncio
+import weakref
+
+from oslo_config import cfg
+
+from account.comment import cache
+
+CONF = cfg.CONF
+
+# KEYS: state. ARGV: failures locking the user, lock_interval.
+# Returns {seconds left locked or 0, 1 if this failure locked the user}.
+_FAIL_SCRIPT = """
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if redis.call('HGET', KEYS[1], 'locked') == '1' then
+    return {redis.call('TTL', KEYS[1]), 0}
+end
+if failures >= tonumber(ARGV[1]) then
+    redis.call('HSET', KEYS[1], 'locked', '1')
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return {tonumber(ARGV[2]), 1}
+end
+if failures == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return {0, 0}
+"""
+
+# KEYS: state, last seen. ARGV: login_last_seen_interval.
+# Returns {1 if there were failures, 1 if last_login must be recorded}.
+_SUCCESS_SCRIPT = """
+local had_failures = redis.call('DEL', KEYS[1])
+if tonumber(ARGV[1]) <= 0 then
+    return {had_failures, 1}
+end
+local seen = redis.call('SET', KEYS[2], '1', 'NX', 'EX', ARGV[1])
+if seen then
+    return {had_failures, 1}
+end
+return {had_failures, 0}
+"""
+
+# KEYS: state. Returns the seconds left locked, 0 if not locked.
+_LOCKED_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'locked') == '1' then
+    return math.max(redis.call('TTL', KEYS[1]), 1)
+end
+return 0
+"""
+
+
+class LoginThrottle(object):
+    """Login attempts of the users, counted in Redis."""
+
+    def __init__(self, client):
+        self.client = client
+        self._fail = client.register_script(_FAIL_SCRIPT)
+        self._success = client.register_script(_SUCCESS_SCRIPT)
+        self._locked = client.register_script(_LOCKED_SCRIPT)
+
+    @staticmethod
+    def _key(*parts):
+        return ':'.join([CONF.cache.cache_key_prefix, 'login'] +
+                        [str(p) for p in parts])
+
+    async def locked(self, user):
+        """Returns how many seconds the user stays locked, 0 if not."""
+        return int(await self._locked(keys=[self._key(user.id)]))
+
+    async def failed(self, user, max_failures):
+        """Counts a failed attempt.
+
+        :returns: seconds the user is locked for, 0 if it is not, and
+                  whether this attempt locked it
+        """
+        retry_in, locked_now = await self._fail(
+            keys=[self._key(user.id)],
+            args=[max_failures, user.lock_interval or 60 * 30])
+        return int(retry_in), bool(locked_now)
+
+    async def succeeded(self, user):
+        """Clears the failures of the user.
+
+        :returns: whether the user had failed attempts, and whether its
+                  last_login is worth recording
+        """
+        had_failures, seen = await self._success(
+            keys=[self._key(user.id), self._key('seen', user.id)],
+            args=[CONF.identity.login_last_seen_interval])
+        return bool(had_failures), bool(seen)
+
+
+_THROTTLES = weakref.WeakKeyDictionary()
+
+
+def get_throttle():
+    """Returns the throttle of the running loop, None without Redis."""
+    loop = asyncio.get_running_loop()
+    throttle = _THROTTLES.get(loop)
+    if throttle is None:
+        client = cache.get_async_client(loop)
+        if client is None:
+            return None
+        throttle = _THROTTLES[loop] = LoginThrottle(client)
+    return throttle
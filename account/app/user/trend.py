@@ -0,0 +1,215 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Incremental rollups of user_login and user into user_history_trend.
+
+user_history_trend holds one row per daily, weekly (from Monday) and
+monthly bucket, with the users who logged in (``active_user``) and the
+users created (``new_user``) during the bucket.  Buckets follow
+``[trend] utc_offset``.
+
+:func:`rollup` only reads the rows added since the previous run: the id of
+the last row rolled up of each table is kept in rollup_watermark, and moves
+forward in the transaction updating the buckets, ``[trend]
+rollup_batch_size`` rows at a time.  A user is counted active in a bucket
+the first time it shows up in it, which only needs the logins of that user
+older than the watermark, found through the (user_uuid, created_at) index.
+
+Rows younger than ``[trend] rollup_lag`` seconds wait for the next run, ids
+are allocated before commit and a slow transaction could commit a row
+below the watermark otherwise.  The account.celery.tasks
+rollup_user_history_trend task runs it periodically.
+
+With ``[trend] active_user_source = hll`` the user_login rollups are
+skipped, active_users.py snapshots fill ``active_user`` instead.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午7:05"
+
+import collections
+import datetime
+import logging
+
+from oslo_config import cfg
+from oslo_utils import timeutils
+from sqlalchemy import and_
+from sqlalchemy import func
+from sqlalchemy import select
+
+from account.comment import api as common_api
+from account.comment import cache
+
+from . import models
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+TREND_DAILY = 1
+TREND_WEEKLY = 2
+TREND_MONTHLY = 3
+TREND_TYPES = (TREND_DAILY, TREND_WEEKLY, TREND_MONTHLY)
+
+
+def _offset():
+    return datetime.timedelta(minutes=CONF.trend.utc_offset)
+
+
+def bucket_range(trend_type, when):
+    """Returns the UTC start and end of the bucket holding a UTC datetime.
+
+    The start is also the ``date`` of the bucket in user_history_trend.
+    """
+    local = when + _offset()
+    day = datetime.datetime(local.year, local.month, local.day)
+    if trend_type == TREND_DAILY:
+        start, end = day, day + datetime.timedelta(days=1)
+    elif trend_type == TREND_WEEKLY:
+        start = day - datetime.timedelta(days=day.weekday())
+        end = start + datetime.timedelta(days=7)
+    elif trend_type == TREND_MONTHLY:
+        start = day.replace(day=1)
+        end = (start + datetime.timedelta(days=32)).replace(day=1)
+    else:
+        raise ValueError('Unknown trend type %r' % trend_type)
+    return start - _offset(), end - _offset()
+
+
+def _watermark(conn, name):
+    """Returns the watermark of a table, locked until the commit."""
+    table = models.RollupWatermark.__table__
+    query = (select([table.c.last_id]).where(table.c.name == name)
+             .with_for_update())
+    last_id = conn.execute(query).scalar()
+    if last_id is None:
+        conn.execute(table.insert().values(name=name, last_id=0,
+                                           updated_at=timeutils.utcnow()))
+        last_id = conn.execute(query).scalar()
+    return last_id
+
+
+def _set_watermark(conn, name, last_id):
+    table = models.RollupWatermark.__table__
+    conn.execute(table.update().where(table.c.name == name)
+                 .values(last_id=last_id, updated_at=timeutils.utcnow()))
+
+
+def _add_to_buckets(conn, deltas):
+    """Adds {(type, start): [active, new]} to the buckets, creating them."""
+    table = models.UserHistoryTrend.__table__
+    for (trend_type, start), (active, new) in sorted(deltas.items()):
+        if not active and not new:
+            continue
+        where = and_(table.c.type == trend_type, table.c.date == start)
+        result = conn.execute(
+            table.update().where(where)
+            .values(active_user=table.c.active_user + active,
+                    new_user=func.coalesce(table.c.new_user, 0) + new))
+        if result.rowcount == 0:
+            conn.execute(table.insert().values(
+                type=trend_type, date=start, active_user=active,
+                new_user=new))
+
+
+def _new_rows(conn, table, columns, last_id, horizon, limit):
+    """Returns the rows after the watermark, by id, up to the first one
+    younger than horizon.  created_at must be the last of the columns.
+    """
+    rows = conn.execute(
+        select(columns)
+        .where(table.c.id > last_id)
+        .order_by(table.c.id)
+        .limit(limit)).fetchall()
+    for i, row in enumerate(rows):
+        if row[-1] is not None and row[-1] >= horizon:
+            return rows[:i]
+    return rows
+
+
+def _rollup_logins(conn, horizon, batch_size):
+    """Rolls up one batch of user_login, returns the rows rolled up."""
+    table = models.UserLogin.__table__
+    last_id = _watermark(conn, 'user_login')
+    rows = _new_rows(conn, table,
+                     [table.c.id, table.c.user_uuid, table.c.created_at],
+                     last_id, horizon, batch_size)
+    if not rows:
+        return 0
+
+    # bucket -> users logging in during the batch
+    users = collections.defaultdict(set)
+    for _id, user_uuid, created_at in rows:
+        if user_uuid is None or created_at is None:
+            continue
+        for trend_type in TREND_TYPES:
+            users[(trend_type, bucket_range(trend_type, created_at))].add(
+                user_uuid)
+
+    deltas = {}
+    for (trend_type, (start, end)), uuids in users.items():
+        seen = conn.execute(
+            select([table.c.user_uuid]).distinct()
+            .where(table.c.user_uuid.in_(uuids))
+            .where(table.c.created_at >= start)
+            .where(table.c.created_at < end)
+            .where(table.c.id <= last_id)).fetchall()
+        active = len(uuids) - len(seen)
+        deltas[(trend_type, start)] = [active, 0]
+
+    _add_to_buckets(conn, deltas)
+    _set_watermark(conn, 'user_login', rows[-1][0])
+    return len(rows)
+
+
+def _rollup_users(conn, horizon, batch_size):
+    """Rolls up one batch of user, returns the rows rolled up."""
+    table = models.User.__table__
+    last_id = _watermark(conn, 'user')
+    rows = _new_rows(conn, table, [table.c.id, table.c.created_at],
+                     last_id, horizon, batch_size)
+    if not rows:
+        return 0
+
+    deltas = collections.defaultdict(lambda: [0, 0])
+    for _id, created_at in rows:
+        if created_at is None:
+            continue
+        for trend_type in TREND_TYPES:
+            start, _end = bucket_range(trend_type, created_at)
+            deltas[(trend_type, start)][1] += 1
+
+    _add_to_buckets(conn, deltas)
+    _set_watermark(conn, 'user', rows[-1][0])
+    return len(rows)
+
+
+def rollup(engine=None):
+    """Rolls up every new user_login and user row.
+
+    :returns: the number of user_login and user rows rolled up
+    """
+    engine = engine or common_api.get_engine()
+    batch_size = CONF.trend.rollup_batch_size
+    horizon = timeutils.utcnow() - datetime.timedelta(
+        seconds=CONF.trend.rollup_lag)
+
+    counts = []
+    for rollup_batch in (_rollup_logins, _rollup_users):
+        total = 0
+        if (rollup_batch is _rollup_logins and
+                CONF.trend.active_user_source != 'rollup'):
+            # active_user comes from the active_users snapshots.
+            counts.append(total)
+            continue
+        while True:
+            with engine.begin() as conn:
+                done = rollup_batch(conn, horizon, batch_size)
+            total += done
+            if done < batch_size:
+                break
+        counts.append(total)
+
+    if any(counts):
+        cache.invalidate(models.UserHistoryTrend)
+    LOG.info('Rolled up %d user_login and %d user rows', *counts)
+    return tuple(counts)
@@ -8,6 +8,8 @@ from oslo_config import cfg
 from celery import Celery, platforms
 from datetime import timedelta
 
+from account.comment import metrics
+
 CONF = cfg.CONF
 
 app = Celery('account',
@@ -20,6 +22,9 @@ app.conf.timezone = "Asia/Shanghai"
 
 platforms.C_FORCE_ROOT = True
 
+# 任务耗时指标, 由 worker 主进程在 [metrics] celery_port 上提供
+metrics.install_celery()
+
 app.conf.beat_schedule = {
 
     'sync_vendor_aliyun_ecs_status': {
@@ -29,6 +34,24 @@ app.conf.beat_schedule = {
         'schedule': timedelta(seconds=15)
     },
 
+    'rollup_user_history_trend': {
+        # 增量汇总 user_login/user 到 user_history_trend
+        'task': 'account.celery.tasks.rollup_user_history_trend',
+        'schedule': timedelta(minutes=5)
+    },
+
+    'snapshot_active_users': {
+        # HyperLogLog 日/周/月活跃用户快照写入 user_history_trend
+        'task': 'account.celery.tasks.snapshot_active_users',
+        'schedule': timedelta(minutes=10)
+    },
+
+    'maintain_partitions': {
+        # user_login/user_quota_bill 按月分区: 提前建分区, 归档并删除过期分区
+        'task': 'account.celery.tasks.maintain_partitions',
+        'schedule': timedelta(days=1)
+    },
+
 }
 
 
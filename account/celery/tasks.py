@@ -18,3 +18,35 @@ def sync_vendor_aliyun_ecs_status():
     LOG.info('-------------------sync_vendor_aliyun_ecs_status-------------------')
 
 
+@shared_task
+def rollup_user_history_trend():
+    from account.app.user import trend
+
+    trend.rollup()
+
+
+@shared_task
+def snapshot_active_users():
+    import datetime
+
+    from oslo_config import cfg
+
+    from account.app.user import active_users
+
+    if cfg.CONF.trend.active_user_source != 'hll':
+        return
+    today = active_users.local_date()
+    # Finalize yesterday's buckets too, the first run after midnight.
+    active_users.snapshot(today - datetime.timedelta(days=1))
+    active_users.snapshot(today)
+
+
+@shared_task
+def maintain_partitions():
+    from account.app.user import models
+    from account.comment import partition
+
+    for model in (models.UserLogin, models.UserQuotaBill):
+        created, dropped = partition.PartitionManager(model).maintain()
+        LOG.info('%s partitions: %d created, %d archived and dropped',
+                 model.__tablename__, len(created), len(dropped))
@@ -1,25 +1,40 @@
 """Implementation of SQLAlchemy backend."""
 
+import base64
+import binascii
+import decimal
 import functools
+import os
 import sys
 import threading
 import time
 import driver_hints, utils
 
 from oslo_config import cfg
-from oslo_db import exception as db_exc
 from oslo_db import options as oslo_db_options
 from oslo_db.sqlalchemy import session as db_session
 from oslo_db.sqlalchemy import utils as sqlalchemyutils
 from oslo_log import log as logging
 from oslo_utils import timeutils
 import six
+from sqlalchemy import func
 from sqlalchemy import or_
+from sqlalchemy import text
 from sqlalchemy import Boolean
+from sqlalchemy import DateTime
+from sqlalchemy import Numeric
+
+from account.db import models
 
 import exception
+from . import jsonutils
+from . import metrics
+from . import partition
+from . import querystats
+from . import replica
+from . import retry
+from . import search
 from .i18n import _
-import copy
 
 CONF = cfg.CONF
 CONF.register_opts(oslo_db_options.database_opts, 'database')
@@ -29,6 +44,7 @@ LOG = logging.getLogger(__name__)
 
 _LOCK = threading.Lock()
 _FACADE = None
+_REPLICA_ROUTER = None
 
 
 def _create_facade_lazily():
@@ -40,6 +56,9 @@ def _create_facade_lazily():
                 CONF.database.connection,
                 **dict(CONF.database)
             )
+            querystats.install(_FACADE.get_engine())
+            metrics.install_pool(_FACADE.get_engine(), 'primary')
+            replica.install(_FACADE.get_engine())
 
         return _FACADE
 
@@ -54,8 +73,37 @@ def get_session(**kwargs):
     return facade.get_session(**kwargs)
 
 
+def get_replica_router():
+    global _REPLICA_ROUTER
+    with _LOCK:
+        if _REPLICA_ROUTER is None:
+            _REPLICA_ROUTER = replica.ReplicaRouter(
+                get_session, replica.replica_connections())
+        return _REPLICA_ROUTER
+
+
 def dispose_engine():
     get_engine().dispose()
+    if _REPLICA_ROUTER is not None:
+        _REPLICA_ROUTER.dispose()
+
+
+def _dispose_after_fork():
+    """Forgets the DB connections a forked process inherited.
+
+    They are still used by the parent, so the pools are emptied without
+    closing them, and the child opens its own connections.
+    """
+    global _LOCK
+    # Possibly held by another thread of the parent at the time of the fork
+    _LOCK = threading.Lock()
+    if _FACADE is not None:
+        _FACADE.get_engine().dispose(close=False)
+    if _REPLICA_ROUTER is not None:
+        _REPLICA_ROUTER.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
 
 
 def get_backend():
@@ -64,21 +112,11 @@ def get_backend():
 
 
 def _retry_on_deadlock(f):
-    """Decorator to retry a DB API call if Deadlock was received."""
-    @functools.wraps(f)
-    def wrapped(*args, **kwargs):
-        while True:
-            try:
-                return f(*args, **kwargs)
-            except db_exc.DBDeadlock:
-                LOG.warning("Deadlock detected when running "
-                                "'%(func_name)s': Retrying...",
-                            dict(func_name=f.__name__))
-                # Retry!
-                time.sleep(0.5)
-                continue
-    functools.update_wrapper(wrapped, f)
-    return wrapped
+    """Decorator to retry a DB API call if Deadlock was received.
+
+    Retries are bounded and jittered, see :class:`retry.RetryPolicy`.
+    """
+    return retry.RetryPolicy()(f)
 
 
 def model_query(model,
@@ -86,27 +124,35 @@ def model_query(model,
                 session=None,
                 use_slave=False,
                 read_deleted=None,
-                has_deleted_col=True):
+                has_deleted_col=True,
+                period=None):
     """Query helper that accounts for context's `read_deleted` field.
 
     :param model:       Model to query. Must be a subclass of ModelBase.
     :param args:        Arguments to query. If None - model is used.
     :param session:     If present, the session to use.
-    :param use_slave:   If true, use a slave connection to the DB if creating a
-                        session.
+    :param use_slave:   If true, read from a replica of the DB if creating a
+                        session and one is fit for it, see
+                        :class:`replica.ReplicaRouter`.
     :param read_deleted: If not None, overrides context's read_deleted field.
                         Permitted values are 'no', which does not return
                         deleted values; 'only', which only returns deleted
                         values; and 'yes', which does not filter deleted
                         values.
     :param has_deleted_col: If true, table has column named deleted.
+    :param period: (start, end) of the rows created, end excluded and
+                   either bound None for no bound, to only read the
+                   partitions overlapping it. Only for models with a
+                   ``__partition_by__`` column, see :mod:`partition`;
+                   their queries read every partition without it.
     """
 
     if session is None:
-        if CONF.database.slave_connection == '':
-            use_slave = False
-        session = get_session(use_slave=use_slave)
-    
+        if use_slave:
+            session = get_replica_router().get_session()
+        else:
+            session = get_session()
+
     if read_deleted is None and has_deleted_col:
         read_deleted = 'no'
 
@@ -123,9 +169,68 @@ def model_query(model,
                              read_deleted)
 
     query = sqlalchemyutils.model_query(model, session, args, **query_kwargs)
+    if period is not None:
+        query = partition.restrict(query, model, *period)
+    elif partition.partition_column(model) is not None:
+        query = partition.restrict(query, model)
     return query
 
 
+def query_to_dicts(model, query, columns=None):
+    """Materializes the rows of a query as dicts, bypassing the ORM.
+
+    Only the needed columns are selected and the rows are read as plain
+    tuples, so no model instance is built and nothing goes through the
+    identity map. Meant for read-only listings, which are serialized
+    right away.
+
+    :param model: model queried
+    :param query: query of the model, filtered, sorted and paginated as
+                  needed, or the empty list returned for filters that
+                  cannot match
+    :param columns: names of the columns to read, all of them by default
+    :returns: list of dicts, one per row, keyed on column names
+    """
+    if isinstance(query, list):
+        return query
+
+    if columns is None:
+        names = models.column_accessor(model)[0]
+    else:
+        names = tuple(columns)
+    query = query.with_entities(*[getattr(model, name) for name in names])
+    return [dict(zip(names, row)) for row in query]
+
+
+def stream_dicts(model, query, columns=None, batch_size=1000):
+    """Yields the rows of a query as dicts, reading them in batches.
+
+    Same as query_to_dicts, but the rows are fetched from a server-side
+    cursor ``batch_size`` at a time, so memory use does not grow with the
+    number of rows.  The session of the query is closed once the rows are
+    exhausted, or when the generator is closed early, to give its
+    connection back.
+
+    :param batch_size: rows fetched from the database at a time
+    """
+    if isinstance(query, list):
+        return
+
+    if columns is None:
+        names = models.column_accessor(model)[0]
+    else:
+        names = tuple(columns)
+    query = (query.with_entities(*[getattr(model, name) for name in names])
+             .execution_options(stream_results=True,
+                                max_row_buffer=batch_size)
+             .yield_per(batch_size))
+    try:
+        for row in query:
+            yield dict(zip(names, row))
+    finally:
+        query.session.close()
+
+
 def convert_objects_related_datetimes(values, *datetime_keys):
     for key in datetime_keys:
         if key in values and values[key]:
@@ -360,106 +465,119 @@ class _WontMatch(Exception):
         if not hasattr(col.type, 'length'):
             # The column doesn't have a length so can't validate anymore.
             return
-        if len(value) > col.type.length:
+        if (col.type.length is not None and isinstance(value, str) and
+                len(value) > col.type.length):
             raise cls()
             # Otherwise the value could match a value in the column.
 
 
-def _filter(model, query, hints):
-    """Applies filtering to a query.
+def _exact_step(column_attr):
+    col = column_attr.property.columns[0]
+    if isinstance(col.type, Boolean):
+        def step(query, value):
+            return query.filter(column_attr == utils.attr_as_boolean(value)), \
+                True
+        return step
 
-    :param model: the table model in question
-    :param query: query to apply filters to
-    :param hints: contains the list of filters yet to be satisfied.
-                  Any filters satisfied here will be removed so that
-                  the caller will know if any filters remain.
+    def step(query, value):
+        _WontMatch.check(value, column_attr)
+        return query.filter(column_attr == value), True
+    return step
 
-    :returns query: query, updated with any filters satisfied
 
-    """
-    def inexact_filter(model, query, filter_, satisfied_filters):
-        """Applies an inexact filter to a query.
+def _not_equal_step(column_attr):
+    def step(query, value):
+        # Applied, but left to the caller as well, see _compile_filter_plan.
+        return query.filter(column_attr != value), False
+    return step
 
-        :param model: the table model in question
-        :param query: query to apply filters to
-        :param dict filter_: describes this filter
-        :param list satisfied_filters: filter_ will be added if it is
-                                       satisfied.
 
-        :returns query: query updated to add any inexact filters we could
-                        satisfy
+def _like_step(column_attr, pattern):
+    def step(query, value):
+        _WontMatch.check(value, column_attr)
+        return query.filter(column_attr.ilike(pattern % value)), True
+    return step
 
-        """
-        column_attr = getattr(model, filter_['name'])
-
-        # TODO(henry-nash): Sqlalchemy 0.7 defaults to case insensitivity
-        # so once we find a way of changing that (maybe on a call-by-call
-        # basis), we can add support for the case sensitive versions of
-        # the filters below.  For now, these case sensitive versions will
-        # be handled at the controller level.
-
-        if filter_['case_sensitive']:
-            if filter_['comparator'] == 'notequal':
-                query = query.filter(column_attr!=filter_['value'])
-            return query
-
-        if filter_['comparator'] == 'contains':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%%%s%%' % filter_['value'])
-        elif filter_['comparator'] == 'startswith':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%s%%' % filter_['value'])
-        elif filter_['comparator'] == 'endswith':
-            _WontMatch.check(filter_['value'], column_attr)
-            query_term = column_attr.ilike('%%%s' % filter_['value'])
+
+def _search_step(model, name, backend):
+    def step(query, value):
+        return query.filter(search.search_clause(model, name, value,
+                                                 backend)), True
+    return step
+
+
+_LIKE_PATTERNS = {'contains': '%%%s%%',
+                  'startswith': '%s%%',
+                  'endswith': '%%%s'}
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_filter_plan(model, filters_shape):
+    """Compiles the filters of a hints shape into a plan for a model.
+
+    :param filters_shape: the filters part of ``Hints.shape()``
+    :returns: one step per filter, None for the filters left to the caller.
+              A step takes the query and the filter value and returns the
+              filtered query and whether the filter is satisfied.
+    """
+    columns = model.__table__.columns
+    plan = []
+    for name, comparator, case_sensitive in filters_shape:
+        if comparator == 'search' and search.is_searchable(model, name):
+            plan.append(_search_step(model, name, search.backend_name()))
+            continue
+        if name not in columns:
+            plan.append(None)
+            continue
+        column_attr = getattr(model, name)
+        if comparator == 'equals':
+            plan.append(_exact_step(column_attr))
+        elif case_sensitive:
+            # TODO(henry-nash): Sqlalchemy 0.7 defaults to case insensitivity
+            # so once we find a way of changing that (maybe on a call-by-call
+            # basis), we can add support for the case sensitive versions of
+            # the filters below.  For now, these case sensitive versions will
+            # be handled at the controller level.
+            if comparator == 'notequal':
+                plan.append(_not_equal_step(column_attr))
+            else:
+                plan.append(None)
+        elif comparator in _LIKE_PATTERNS:
+            plan.append(_like_step(column_attr, _LIKE_PATTERNS[comparator]))
         else:
             # It's a filter we don't understand, so let the caller
             # work out if they need to do something with it.
-            return query
-
-        satisfied_filters.append(filter_)
-        return query.filter(query_term)
+            plan.append(None)
+    return tuple(plan)
 
-    def exact_filter(model, query, filter_, satisfied_filters):
-        """Applies an exact filter to a query.
 
-        :param model: the table model in question
-        :param query: query to apply filters to
-        :param dict filter_: describes this filter
-        :param list satisfied_filters: filter_ will be added if it is
-                                       satisfied.
-        :returns query: query updated to add any exact filters we could
-                        satisfy
-        """
-        key = filter_['name']
+def _filter(model, query, hints):
+    """Applies filtering to a query.
 
-        col = getattr(model, key)
-        if isinstance(col.property.columns[0].type, Boolean):
-            filter_val = utils.attr_as_boolean(filter_['value'])
-        else:
-            _WontMatch.check(filter_['value'], col)
-            filter_val = filter_['value']
+    The filters are applied through a plan compiled once per model and
+    hints shape, see _compile_filter_plan.
 
-        satisfied_filters.append(filter_)
-        return query.filter(col == filter_val)
-    print('----------------------------------------')
-    print(hints)
-    try:
-        satisfied_filters = []
-        for filter_ in hints.filters:
-            if filter_['name'] not in model.__table__.columns:
-                continue
-            if filter_['comparator'] == 'equals':
-                query = exact_filter(model, query, filter_,
-                                     satisfied_filters)
-            else:
-                query = inexact_filter(model, query, filter_,
-                                       satisfied_filters)
+    :param model: the table model in question
+    :param query: query to apply filters to
+    :param hints: contains the list of filters yet to be satisfied.
+                  Any filters satisfied here will be removed so that
+                  the caller will know if any filters remain.
 
-        # Remove satisfied filters, then the caller will know remaining filters
-        for filter_ in satisfied_filters:
-            hints.filters.remove(filter_)
+    :returns query: query, updated with any filters satisfied
 
+    """
+    plan = _compile_filter_plan(model, hints.shape()[0])
+    try:
+        remaining = []
+        for filter_, step in zip(hints.filters, plan):
+            satisfied = False
+            if step is not None:
+                query, satisfied = step(query, filter_['value'])
+            if not satisfied:
+                remaining.append(filter_)
+
+        # Only the unsatisfied filters are left for the caller
+        hints.filters = remaining
         return query
     except _WontMatch:
         hints.cannot_match = True
@@ -520,6 +638,145 @@ def filter_limit_query(model, query, hints):
         return query
 
 
+class _CursorMarker(object):
+    """Marker rebuilt from the sort key values carried by a cursor.
+
+    paginate_query() only reads the sort key attributes of its marker, so
+    seeking past the previous page does not need to load the marker row.
+    """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+def encode_cursor(ref, sort_keys, sort_dirs):
+    """Build the opaque cursor pointing right after ``ref``.
+
+    :param ref: last row of the current page
+    :param sort_keys: sort keys as returned by process_sort_params
+    :param sort_dirs: sort directions as returned by process_sort_params
+    :returns: url safe token to pass to Hints.set_cursor
+    """
+    payload = {'k': list(sort_keys),
+               'd': list(sort_dirs),
+               'v': [getattr(ref, key) for key in sort_keys]}
+    raw = jsonutils.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(model, cursor, sort_keys, sort_dirs):
+    """Turn a cursor back into a marker usable by paginate_query.
+
+    :raise exception.InvalidInput: if the cursor is malformed or was built
+                                   for another sort order
+    """
+    try:
+        payload = jsonutils.loads(
+            base64.urlsafe_b64decode(cursor.encode('ascii')))
+        keys, dirs, values = payload['k'], payload['d'], payload['v']
+    except (AttributeError, TypeError, ValueError, KeyError,
+            binascii.Error):
+        raise exception.InvalidInput(reason=_("Malformed pagination cursor"))
+
+    if (keys != list(sort_keys) or dirs != list(sort_dirs) or
+            len(values) != len(keys)):
+        msg = _("Pagination cursor does not match the requested sort order")
+        raise exception.InvalidInput(reason=msg)
+
+    columns = model.__table__.columns
+    marker = {}
+    for key, value in zip(keys, values):
+        col = columns.get(key)
+        if value is not None and col is not None:
+            # NOTE: JSON flattened these, give them back their column type
+            # so the seek predicate compares like with like.
+            if isinstance(col.type, DateTime):
+                value = timeutils.parse_strtime(
+                    value, timeutils.PERFECT_TIME_FORMAT)
+            elif isinstance(col.type, Numeric):
+                value = decimal.Decimal(str(value))
+        marker[key] = value
+    return _CursorMarker(marker)
+
+
+def _check_offset(offset):
+    max_offset = CONF.database.max_pagination_offset
+    try:
+        offset = int(offset)
+    except (TypeError, ValueError):
+        raise exception.InvalidInput(
+            reason=_("Offset must be an integer, got %s") % offset)
+    if offset < 0:
+        raise exception.InvalidInput(
+            reason=_("Offset must not be negative"))
+    if max_offset and offset > max_offset:
+        msg = (_("Offset %(offset)s exceeds the maximum pagination depth "
+                 "%(max)s, use a pagination cursor instead") %
+               {'offset': offset, 'max': max_offset})
+        raise exception.InvalidInput(reason=msg)
+    return offset
+
+
+def _pop_offset(hints):
+    """Removes the ``offset`` pseudo filter from hints, returns its value."""
+    offset = None
+    filters = []
+    for filter_ in hints.filters:
+        if filter_['name'] == 'offset':
+            offset = filter_['value']
+        else:
+            filters.append(filter_)
+    hints.filters = filters
+    return offset
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_sort_params(sort_keys, sort_dirs):
+    sort_keys, sort_dirs = process_sort_params(list(sort_keys),
+                                               list(sort_dirs))
+    return tuple(sort_keys), tuple(sort_dirs)
+
+
+def _sort_params(hints):
+    """process_sort_params of the hints, cached by sort shape."""
+    sort_keys, sort_dirs = _cached_sort_params(tuple(hints.sort_keys),
+                                               tuple(hints.sort_dirs))
+    return list(sort_keys), list(sort_dirs)
+
+
+def _pagination_params(model, hints, offset):
+    """Resolves the sort order, marker and offset of the requested page.
+
+    :returns: sort keys, sort directions, marker and offset
+    """
+    sort_keys, sort_dirs = _sort_params(hints)
+
+    marker = hints.marker
+    if hints.cursor:
+        if offset:
+            msg = _("Offset and pagination cursor are mutually exclusive")
+            raise exception.InvalidInput(reason=msg)
+        marker = decode_cursor(model, hints.cursor, sort_keys, sort_dirs)
+    elif offset:
+        offset = _check_offset(offset)
+    return sort_keys, sort_dirs, marker, offset
+
+
+def _paginate(model, query, hints, sort_keys, sort_dirs, marker, offset):
+    if hints.limit:
+        limit = hints.limit['limit']
+    else:
+        limit = None
+    query = sqlalchemyutils.paginate_query(query, model,
+                                           limit,
+                                           sort_keys,
+                                           marker=marker,
+                                           sort_dirs=sort_dirs)
+    if offset:
+        query = query.offset(offset)
+    return query
+
+
 def filter_limit_query_with_offset(model, query, hints):
     """Applies filtering and limit to a query.
 
@@ -537,16 +794,8 @@ def filter_limit_query_with_offset(model, query, hints):
 
     if hints is None:
         return query
-    offset = None
-    filters = copy.copy(hints.filters)
-    for filter_ in hints.filters:
-        if filter_['name'] == 'offset':
-            offset = filter_['value']
-            filters.remove(filter_)
-    hints.filters = copy.copy(filters)
-
-    sort_keys, sort_dirs = process_sort_params(hints.sort_keys,
-                                               hints.sort_dirs)
+    offset = _pop_offset(hints)
+    params = _pagination_params(model, hints, offset)
 
     # First try and satisfy any filters
     query = _filter(model, query, hints)
@@ -567,35 +816,157 @@ def filter_limit_query_with_offset(model, query, hints):
     # else:
     #     return query
 
-    if hints.limit:
-        limit = hints.limit['limit']
-    else:
-        limit = None
-    query = sqlalchemyutils.paginate_query(query, model,
-                                           limit,
-                                           sort_keys,
-                                           marker=hints.marker,
-                                           sort_dirs=sort_dirs)
-    if offset:
-        query = query.offset(int(offset))
+    return _paginate(model, query, hints, *params)
 
-    return query
+
+def filter_limit_query_with_cursor(model, query, hints):
+    """Lists one page of a query using keyset (seek) pagination.
+
+    Unlike offset pagination, the cost of a page does not depend on how deep
+    it is: the cursor set through ``hints.set_cursor`` is turned into a
+    ``WHERE`` predicate on the sort keys, so the database seeks straight to
+    the first row of the page instead of scanning and discarding the
+    previous ones.
+
+    :param model: table model
+    :param query: query to apply filters to
+    :param hints: same as filter_limit_query_with_offset. On return
+                  ``hints.next_cursor`` holds the cursor of the following
+                  page, or None when this page is the last one.
+
+    :returns: list of the rows of the page
+
+    """
+    if hints is None:
+        return query.all()
+
+    hints.next_cursor = None
+    limit = hints.limit['limit'] if hints.limit else None
+    if limit:
+        # Ask for one more row to find out whether there is a next page.
+        hints.set_limit(limit + 1)
+    try:
+        query = filter_limit_query_with_offset(model, query, hints)
+        refs = list(query)
+    finally:
+        if limit:
+            hints.set_limit(limit)
+
+    if limit and len(refs) > limit:
+        refs = refs[:limit]
+        hints.set_limit(limit, truncated=True)
+        sort_keys, sort_dirs = _sort_params(hints)
+        hints.next_cursor = encode_cursor(refs[-1], sort_keys, sort_dirs)
+    return refs
 
 
 def filter_limit_query_with_count(model, query, hints):
     if hints is None:
         return query.count()
 
-    filters = copy.copy(hints.filters)
-    for filter_ in hints.filters:
-        if filter_['name'] == 'offset':
-            filters.remove(filter_)
-    hints.filters = copy.copy(filters)
+    _pop_offset(hints)
     # First try and satisfy any filters
     query = _filter(model, query, hints)
-    count = query.count()
 
     if hints.cannot_match:
         # Nothing's going to match, so don't bother with the query.
         return 0
-    return count
\ No newline at end of file
+    return query.count()
+
+
+def _supports_window_functions(dialect):
+    version = dialect.server_version_info or ()
+    if dialect.name == 'mysql':
+        if getattr(dialect, 'is_mariadb', False):
+            return version >= (10, 2)
+        return version >= (8, 0)
+    if dialect.name == 'sqlite':
+        return version >= (3, 25)
+    return dialect.name == 'postgresql'
+
+
+_APPROXIMATE_COUNTS = {}
+
+
+def _approximate_count(session, model):
+    """Returns the cached row estimate of a huge table, None otherwise.
+
+    The estimate comes from the InnoDB statistics exposed through
+    information_schema, so it costs no scan at all. It is only used once the
+    table is bigger than [database] approximate_count_threshold rows, where
+    an exact COUNT(*) gets expensive and nobody pages through it anyway.
+    """
+    threshold = CONF.database.approximate_count_threshold
+    engine = session.get_bind()
+    if not threshold or engine.dialect.name != 'mysql':
+        return None
+
+    table_name = model.__table__.name
+    now = time.time()
+    with _LOCK:
+        cached = _APPROXIMATE_COUNTS.get(table_name)
+    if cached is None or cached[0] < now:
+        estimate = session.execute(
+            text("SELECT table_rows FROM information_schema.tables "
+                 "WHERE table_schema = DATABASE() AND table_name = :name"),
+            {'name': table_name}).scalar()
+        cached = (now + CONF.database.approximate_count_cache_ttl,
+                  int(estimate or 0))
+        with _LOCK:
+            _APPROXIMATE_COUNTS[table_name] = cached
+
+    if cached[1] < threshold:
+        return None
+    return cached[1]
+
+
+def filter_limit_query_with_total(model, query, hints):
+    """Lists one page of a query together with the total number of matches.
+
+    This replaces the filter_limit_query_with_offset plus
+    filter_limit_query_with_count pair, which filters the query twice and
+    costs two round trips.  Where the database supports window functions
+    the total rides along the page as ``COUNT(*) OVER ()``.  For huge tables
+    listed without any filter, the total is the cached table row estimate
+    and ``hints.total_approximate`` is set.
+
+    :param model: table model
+    :param query: query to apply filters to
+    :param hints: same as filter_limit_query_with_offset
+
+    :returns: tuple of the list of rows of the page and the total number
+              of rows matching the filters
+
+    """
+    if hints is None:
+        return query.all(), query.count()
+
+    hints.total_approximate = False
+    offset = _pop_offset(hints)
+    params = _pagination_params(model, hints, offset)
+
+    if not hints.filters:
+        estimate = _approximate_count(query.session, model)
+        if estimate is not None:
+            hints.total_approximate = True
+            return _paginate(model, query, hints, *params).all(), estimate
+
+    query = _filter(model, query, hints)
+    if hints.cannot_match:
+        return [], 0
+
+    page = _paginate(model, query, hints, *params)
+    sort_keys, sort_dirs, marker, offset = params
+    dialect = query.session.get_bind().dialect
+    # NOTE: a marker turns into a WHERE clause, the window would then only
+    # count the rows after it, so seeking pages still need their own count.
+    if marker is None and _supports_window_functions(dialect):
+        rows = page.add_columns(func.count().over()).all()
+        if rows:
+            return [row[0] for row in rows], rows[0][-1]
+        if not offset:
+            return [], 0
+        # Paged past the end, nothing left to read the total from.
+        return [], query.count()
+
+    return page.all(), query.count()
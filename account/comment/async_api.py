@@ -0,0 +1,164 @@
+"""Asyncio flavour of the SQLAlchemy backend.
+
+Mirrors :func:`api.model_query`, :func:`api.filter_limit_query_with_offset`
+and :func:`api.filter_limit_query_with_count` on top of an ``AsyncEngine``
+so ``async def`` FastAPI endpoints can query the database without holding
+a threadpool thread for every query in flight::
+
+    async def list_roles():
+        async with async_api.get_session() as session:
+            query = async_api.model_query(models.Role)
+            return await async_api.filter_limit_query_with_offset(
+                models.Role, query, hints, session)
+
+The engine connects to ``[database] async_connection``, or to
+``[database] connection`` with its driver swapped for the asyncio one
+(asyncmy or aiomysql for MySQL, aiosqlite for SQLite).  Filters, sorting and
+pagination are shared with the synchronous backend.
+"""
+
+import os
+import threading
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import importutils
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from . import api
+from . import metrics
+from . import querystats
+from . import replica
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+
+_LOCK = threading.Lock()
+_ENGINE = None
+_SESSION_MAKER = None
+
+
+def _async_drivername(backend):
+    if backend == 'mysql':
+        if importutils.try_import('asyncmy') is not None:
+            return 'mysql+asyncmy'
+        return 'mysql+aiomysql'
+    if backend == 'sqlite':
+        return 'sqlite+aiosqlite'
+    if backend == 'postgresql':
+        return 'postgresql+asyncpg'
+    raise ValueError("No asyncio driver known for database '%s'" % backend)
+
+
+def _async_connection():
+    if CONF.database.async_connection:
+        return make_url(CONF.database.async_connection)
+    url = make_url(CONF.database.connection)
+    return url.set(drivername=_async_drivername(url.get_backend_name()))
+
+
+def _create_engine_lazily():
+    global _ENGINE, _SESSION_MAKER
+    with _LOCK:
+        if _ENGINE is None:
+            url = _async_connection()
+            kwargs = {'pool_recycle': CONF.database.connection_recycle_time}
+            if url.get_backend_name() != 'sqlite':
+                kwargs['pool_size'] = CONF.database.max_pool_size
+                kwargs['max_overflow'] = CONF.database.max_overflow
+            _ENGINE = create_async_engine(url, **kwargs)
+            querystats.install(_ENGINE.sync_engine)
+            metrics.install_pool(_ENGINE.sync_engine, 'async')
+            replica.install(_ENGINE.sync_engine)
+            _SESSION_MAKER = sessionmaker(_ENGINE, class_=AsyncSession,
+                                          expire_on_commit=False)
+        return _ENGINE
+
+
+def get_engine():
+    return _create_engine_lazily()
+
+
+def get_session():
+    """Returns a new AsyncSession, use it as an async context manager."""
+    _create_engine_lazily()
+    return _SESSION_MAKER()
+
+
+async def dispose_engine():
+    await get_engine().dispose()
+
+
+def _dispose_after_fork():
+    # The connections belong to the parent and to its event loop, see
+    # api._dispose_after_fork.
+    global _LOCK
+    _LOCK = threading.Lock()
+    if _ENGINE is not None:
+        _ENGINE.sync_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def model_query(model, args=None, read_deleted=None, has_deleted_col=True):
+    """Select helper with the read_deleted semantics of api.model_query.
+
+    :returns: a ``Select`` to pass to the listing functions below or to
+              ``session.execute()``
+    """
+    if read_deleted is None and has_deleted_col:
+        read_deleted = 'no'
+
+    query = select(*(args or [model]))
+    if 'no' == read_deleted:
+        query = query.filter(model.deleted == False)  # noqa: E712
+    elif 'only' == read_deleted:
+        query = query.filter(model.deleted == True)  # noqa: E712
+    elif 'yes' == read_deleted:
+        pass
+    elif has_deleted_col:
+        raise ValueError("Unrecognized read_deleted value '%s'" %
+                         read_deleted)
+    return query
+
+
+async def filter_limit_query_with_offset(model, query, hints, session):
+    """Applies filtering and limit to a select, then runs it.
+
+    Same hints handling as api.filter_limit_query_with_offset.
+
+    :returns: list of the rows of the page
+    """
+    if hints is not None:
+        offset = api._pop_offset(hints)
+        params = api._pagination_params(model, hints, offset)
+
+        query = api._filter(model, query, hints)
+        if hints.cannot_match:
+            return []
+        query = api._paginate(model, query, hints, *params)
+
+    result = await session.execute(query)
+    return result.scalars().all()
+
+
+async def filter_limit_query_with_count(model, query, hints, session):
+    """Counts the rows matching a select, see
+    api.filter_limit_query_with_count.
+    """
+    if hints is not None:
+        api._pop_offset(hints)
+        query = api._filter(model, query, hints)
+        if hints.cannot_match:
+            return 0
+
+    result = await session.execute(
+        select(func.count()).select_from(query.subquery()))
+    return result.scalar()
@@ -0,0 +1,234 @@
+"""Read-through cache for DB API functions.
+
+DB API functions listing slowly changing reference data (roles, permissions,
+resources, ...) can be wrapped with :func:`cached`.  Results are kept in the
+Redis server configured in the ``[cache]`` group, keyed on the function, its
+arguments and, for :class:`driver_hints.Hints`, the filters, sort order,
+limit and marker of the listing.
+
+Invalidation is generation based: every table has a generation counter that
+is part of the keys of the results read from it.  Bumping the counter with
+:func:`invalidate` makes all those keys unreachable at once, they simply
+expire later.  ``satelliteBase.save()`` (and thus ``soft_delete()``) bumps the
+generation of its table with :func:`invalidate_on_commit`, once its
+transaction commits; code writing through bulk ``query.update()`` or
+``query.delete()`` calls must call :func:`invalidate` itself.
+
+Functions reading what they must never get from the cache call the
+``uncached`` attribute of the cached function instead.
+
+Caching is best effort: without the ``redis`` package or when the server is
+unreachable, the wrapped function is simply called.
+"""
+
+import collections
+import functools
+import hashlib
+import pickle
+import threading
+import weakref
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import importutils
+from sqlalchemy import event
+from sqlalchemy import orm
+
+from . import metrics
+
+redis = importutils.try_import('redis')
+aioredis = importutils.try_import('redis.asyncio')
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# Hints attributes a DB API function may update, restored on cache hits so
+# callers see the same hints whether the result was cached or not.
+_HINTS_STATE = ('filters', 'limit', 'cannot_match', 'next_cursor',
+                'total_approximate')
+
+_LOCK = threading.Lock()
+_CLIENT = None
+
+# table name -> names of the cached functions reading it
+_REGISTRY = collections.defaultdict(set)
+
+
+# session.info key of the tables to invalidate on commit
+_PENDING = 'cache_invalidate'
+
+# event loop -> asyncio Redis client, these are bound to a loop
+_ASYNC_CLIENTS = weakref.WeakKeyDictionary()
+
+
+def _url():
+    url = CONF.cache.connection
+    if url.startswith('url:'):
+        url = url[len('url:'):]
+    return url
+
+
+def _create_client_lazily():
+    global _CLIENT
+    with _LOCK:
+        if _CLIENT is None and redis is not None:
+            _CLIENT = redis.Redis.from_url(_url())
+        return _CLIENT
+
+
+def get_client():
+    """Returns the Redis client of the ``[cache]`` group, None if disabled."""
+    return _create_client_lazily()
+
+
+def get_async_client(loop):
+    """Returns the asyncio Redis client of the ``[cache]`` group for a loop.
+
+    None if the ``redis`` package is missing or too old for asyncio.
+    """
+    if aioredis is None:
+        return None
+    with _LOCK:
+        client = _ASYNC_CLIENTS.get(loop)
+        if client is None:
+            client = _ASYNC_CLIENTS[loop] = aioredis.Redis.from_url(_url())
+        return client
+
+
+def _key(*parts):
+    return ':'.join([CONF.cache.cache_key_prefix] + [str(p) for p in parts])
+
+
+def _table_name(model_or_table):
+    if isinstance(model_or_table, str):
+        return model_or_table
+    return model_or_table.__table__.name
+
+
+def _generation_key(table):
+    return _key('gen', table)
+
+
+def invalidate(*models):
+    """Drops every cached result read from the given models or tables."""
+    client = get_client()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for model in models:
+            pipe.incr(_generation_key(_table_name(model)))
+        pipe.execute()
+    except redis.RedisError:
+        LOG.warning("Cache invalidation of %s failed", models, exc_info=True)
+
+
+def invalidate_on_commit(session, *models):
+    """Like :func:`invalidate`, once the transaction of session commits.
+
+    Invalidating before the commit would let other sessions cache the old
+    rows again under the new generation.  Nothing is invalidated if the
+    transaction rolls back.
+    """
+    session.info.setdefault(_PENDING, set()).update(
+        _table_name(model) for model in models)
+
+
+@event.listens_for(orm.Session, 'after_commit')
+def _after_commit(session):
+    if session.in_nested_transaction():
+        # A savepoint, the outermost transaction may still roll back.
+        return
+    tables = session.info.pop(_PENDING, None)
+    if tables:
+        invalidate(*tables)
+
+
+@event.listens_for(orm.Session, 'after_soft_rollback')
+def _after_soft_rollback(session, previous_transaction):
+    # Only the outermost transaction, the rows written before a rolled back
+    # savepoint are still committed.
+    if previous_transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _arg_key(value):
+    if hasattr(value, 'filters') and hasattr(value, 'sort_keys'):
+        return ('hints',) + value.canonical()
+    return repr(value)
+
+
+def _find_hints(args, kwargs):
+    for value in list(args) + list(kwargs.values()):
+        if hasattr(value, 'filters') and hasattr(value, 'sort_keys'):
+            return value
+
+
+def cached(*models, **options):
+    """Decorator caching the result of a DB API function.
+
+    :param models: models (or table names) the function reads, a write to
+                   any of them invalidates the cached results
+    :param timeout: TTL in seconds of the results, defaults to
+                    ``[cache] default_timeout``
+
+    The result must be picklable, so return lists of rows rather than
+    queries.  The function itself stays available as the ``uncached``
+    attribute of the wrapper.
+    """
+    timeout = options.get('timeout')
+    tables = [_table_name(model) for model in models]
+
+    def wrapper(f):
+        name = '%s.%s' % (f.__module__, f.__qualname__)
+        for table in tables:
+            _REGISTRY[table].add(name)
+
+        @functools.wraps(f)
+        def wrapped(*args, **kwargs):
+            client = get_client()
+            if client is None:
+                return f(*args, **kwargs)
+
+            hints = _find_hints(args, kwargs)
+            try:
+                generations = client.mget(
+                    [_generation_key(table) for table in tables])
+                digest = hashlib.sha1(repr(
+                    ([_arg_key(arg) for arg in args],
+                     sorted((k, _arg_key(v)) for k, v in kwargs.items()))
+                ).encode('utf-8')).hexdigest()
+                key = _key(name, '.'.join(
+                    (g or b'0').decode('ascii') for g in generations), digest)
+                value = client.get(key)
+            except redis.RedisError:
+                LOG.warning("Cache lookup for %s failed", name, exc_info=True)
+                metrics.count_cache(name, 'error')
+                return f(*args, **kwargs)
+
+            metrics.count_cache(name, 'miss' if value is None else 'hit')
+            if value is not None:
+                result, state = pickle.loads(value)
+                if hints is not None:
+                    hints.__dict__.update(state)
+                return result
+
+            result = f(*args, **kwargs)
+            state = {}
+            if hints is not None:
+                state = {attr: getattr(hints, attr) for attr in _HINTS_STATE
+                         if hasattr(hints, attr)}
+            try:
+                client.set(key, pickle.dumps((result, state)),
+                           ex=timeout or CONF.cache.default_timeout)
+            except (redis.RedisError, pickle.PicklingError, TypeError):
+                LOG.warning("Cache store for %s failed", name, exc_info=True)
+            return result
+        wrapped.uncached = f
+        return wrapped
+    return wrapper
+
+
+def registered_functions(model):
+    """Returns the names of the cached functions reading a model or table."""
+    return sorted(_REGISTRY.get(_table_name(model), ()))
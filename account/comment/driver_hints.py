@@ -14,6 +14,8 @@
 # under the License.
 
 import functools
+import hashlib
+import json
 
 import exception
 from i18n import _
@@ -83,11 +85,21 @@ class Hints(object):
     * ``name``: the name of the attribute being matched
     * ``value``: the value against which it is being matched
     * ``comparator``: the operation, which can be one of ``equals``,
-                      ``startswith`` or ``endswith``
+                      ``startswith`` or ``endswith``, or ``search`` on the
+                      indexed columns of the model, see search.py
     * ``case_sensitive``: whsolar any comparison should take account of
                           case
     * ``type``: will always be 'filter'
 
+    ``shape()`` and ``canonical()`` give hashable views of the hints, the
+    first without the filter values, to key compiled filter plans, cached
+    results and the like on.
+
+    For keyset pagination a ``cursor`` previously handed out in
+    ``next_cursor`` can be set instead of a marker or an offset filter.
+    After a cursor paginated listing, ``next_cursor`` holds the opaque
+    token for the following page, or None if this was the last one.
+
     """
 
     def __init__(self):
@@ -97,6 +109,9 @@ class Hints(object):
         self.sort_keys = list()
         self.sort_dirs = list()
         self.marker = None
+        self.cursor = None
+        self.next_cursor = None
+        self.total_approximate = False
 
     def add_filter(self, name, value, comparator='equals',
                    case_sensitive=False):
@@ -124,3 +139,54 @@ class Hints(object):
             self.sort_keys = sort_key.split(',')
         if sort_dir:
             self.sort_dirs = sort_dir.split(',')
+
+    def set_cursor(self, cursor):
+        """Set the opaque cursor of the page to list (keyset pagination)."""
+        self.cursor = cursor or None
+
+    def shape(self):
+        """Hashable shape of the hints: what is filtered and sorted, and how.
+
+        Two hints of the same shape only differ by their filter values, limit
+        and position, so they filter and sort with the same SQL.
+        """
+        return (tuple((f['name'], f['comparator'], f['case_sensitive'])
+                      for f in self.filters),
+                tuple(self.sort_keys), tuple(self.sort_dirs))
+
+    def canonical(self):
+        """Hashable, JSON serializable form of the hints.
+
+        Filters are sorted, so hints built by adding the same filters in
+        another order have the same canonical form.
+        """
+        marker = self.marker
+        if marker is not None and not isinstance(marker, (str, int)):
+            marker = getattr(marker, 'id', None)
+            if marker is None:
+                marker = repr(self.marker)
+        filters = sorted(((f['name'], f['comparator'], f['case_sensitive'],
+                           _freeze(f['value'])) for f in self.filters),
+                         key=repr)
+        return (tuple(filters),
+                self.limit['limit'] if self.limit else None,
+                tuple(self.sort_keys), tuple(self.sort_dirs),
+                marker, self.cursor)
+
+    def digest(self):
+        """Short stable digest of the canonical form."""
+        raw = json.dumps(self.canonical(), sort_keys=True, default=repr)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _freeze(value):
+    """Turns a filter value into a hashable, JSON serializable one."""
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted((_freeze(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    return repr(value)
@@ -0,0 +1,92 @@
+"""Incremental serialization of listings for streaming HTTP responses.
+
+The serializers consume rows (dicts) from a generator such as
+:func:`api.stream_dicts` and yield ``bytes`` chunks of about
+``chunk_size`` bytes, so a whole table can be exported through a
+``StreamingResponse`` without ever being held in memory::
+
+    rows = api.stream_dicts(models.User, query, columns)
+    return StreamingResponse(export.serialize(rows, columns, 'csv'),
+                             media_type=export.MEDIA_TYPES['csv'])
+"""
+
+import csv
+import io
+
+from . import exception
+from . import jsonutils
+from .i18n import _
+
+MEDIA_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+CHUNK_SIZE = 64 * 1024
+
+# Spreadsheets evaluate cells starting with these as formulas.
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _to_ndjson(rows, columns, chunk_size):
+    buf = []
+    size = 0
+    for row in rows:
+        line = jsonutils.dumps(row) + '\n'
+        buf.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(buf).encode('utf-8')
+            buf = []
+            size = 0
+    if buf:
+        yield ''.join(buf).encode('utf-8')
+
+
+def _csv_cell(value):
+    """Quotes a string a spreadsheet would take for a formula with a
+    leading ``'``, so that exported user data is never evaluated.
+    """
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _to_csv(rows, columns, chunk_size):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_csv_cell(row.get(name)) for name in columns])
+        if buf.tell() >= chunk_size:
+            yield buf.getvalue().encode('utf-8')
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode('utf-8')
+
+
+_SERIALIZERS = {
+    'ndjson': _to_ndjson,
+    'csv': _to_csv,
+}
+
+
+def check_format(fmt):
+    """Raises InvalidInput if fmt is not one of MEDIA_TYPES."""
+    if fmt not in _SERIALIZERS:
+        msg = (_("Unknown export format '%(fmt)s', must be one of "
+                 "%(formats)s") %
+               {'fmt': fmt, 'formats': ', '.join(sorted(_SERIALIZERS))})
+        raise exception.InvalidInput(reason=msg)
+
+
+def serialize(rows, columns, fmt, chunk_size=CHUNK_SIZE):
+    """Yields rows serialized as ``fmt``, by chunks of bytes.
+
+    :param rows: iterable of dicts
+    :param columns: names of the columns, the header and order of CSV
+    :param fmt: ``ndjson`` or ``csv``
+    """
+    check_format(fmt)
+    return _SERIALIZERS[fmt](rows, columns, chunk_size)
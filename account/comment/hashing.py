@@ -0,0 +1,135 @@
+"""Password hashing off the event loop.
+
+Hashing a password, and so verifying one, costs milliseconds of CPU on
+purpose.  Run inline in an ``async def`` endpoint it stalls every request of
+the worker meanwhile, so the API hashes in a pool of
+``[identity] password_hash_workers`` processes (or threads) instead::
+
+    if not await hashing.check_password(password, user.password):
+        ...
+
+The pool is bounded: at most ``[identity] password_hash_max_pending``
+hashes are queued or running per worker.  Further callers wait up to
+``[identity] password_hash_queue_timeout`` seconds for room, then get
+:class:`exception.PasswordHashingBusy`, so a login burst is shed instead of
+piling up unbounded latency.
+"""
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import weakref
+
+from oslo_config import cfg
+
+from . import exception
+from . import utils
+
+CONF = cfg.CONF
+
+
+class HashingPool(object):
+    """Bounded executor of password hashes and verifications.
+
+    Unset parameters default to the ``[identity] password_hash_*`` options.
+
+    :param executor: ``process`` or ``thread``
+    :param workers: size of the pool
+    :param max_pending: hashes queued or running at most
+    :param queue_timeout: seconds to wait for room before giving up
+    """
+
+    def __init__(self, executor=None, workers=None, max_pending=None,
+                 queue_timeout=None):
+        self.executor = executor or CONF.identity.password_hash_executor
+        if workers is None:
+            workers = CONF.identity.password_hash_workers
+        self.workers = workers
+        self.max_pending = (max_pending or
+                            CONF.identity.password_hash_max_pending)
+        if queue_timeout is None:
+            queue_timeout = CONF.identity.password_hash_queue_timeout
+        self.queue_timeout = queue_timeout
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        # One semaphore per event loop, asyncio ones are bound to a loop.
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _get_pool(self):
+        # A pool does not survive a fork, each worker process makes its own.
+        pid = os.getpid()
+        if self._pool_pid != pid:
+            with self._lock:
+                if self._pool_pid != pid:
+                    if self.executor == 'thread':
+                        self._pool = concurrent.futures.ThreadPoolExecutor(
+                            self.workers, thread_name_prefix='hashing')
+                    else:
+                        # Spawned, not forked from a threaded API worker.
+                        self._pool = concurrent.futures.ProcessPoolExecutor(
+                            self.workers,
+                            mp_context=multiprocessing.get_context('spawn'))
+                    self._pool_pid = pid
+        return self._pool
+
+    def _get_semaphore(self, loop):
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores.setdefault(
+                loop, asyncio.Semaphore(self.max_pending))
+        return semaphore
+
+    async def run(self, fn, *args):
+        """Runs fn(*args) in the pool once there is room for it.
+
+        :raise exception.PasswordHashingBusy: if there was no room within
+                                              queue_timeout
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise exception.PasswordHashingBusy()
+        try:
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        finally:
+            semaphore.release()
+
+    async def hash_password(self, password):
+        return await self.run(utils.hash_password, password,
+                              CONF.identity.password_hash_rounds)
+
+    async def check_password(self, password, hashed):
+        return await self.run(utils.check_password, password, hashed)
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pool_pid == os.getpid():
+                self._pool.shutdown(wait=False)
+            self._pool = None
+            self._pool_pid = None
+
+
+_LOCK = threading.Lock()
+_POOL = None
+
+
+def get_pool():
+    global _POOL
+    with _LOCK:
+        if _POOL is None:
+            _POOL = HashingPool()
+        return _POOL
+
+
+async def hash_password(password):
+    return await get_pool().hash_password(password)
+
+
+async def check_password(password, hashed):
+    return await get_pool().check_password(password, hashed)
@@ -13,6 +13,15 @@ _translators = oslo_i18n.TranslatorFactory(domain=DOMAIN)
 # The primary translation function using the well-known name "_"
 _ = _translators.primary
 
+
+def N_(msg):
+    """Marks a message for translation without translating it.
+
+    For messages defined at import, such as the msg_fmt of the exceptions,
+    which are passed to ``_`` when used instead.
+    """
+    return msg
+
 # Translators for log levels.
 #
 # The abbreviated names are meant to reflect the usual use of a short
@@ -0,0 +1,306 @@
+"""Prometheus metrics of account-api, account-sync and the Celery workers.
+
+Each service calls :func:`setup` in its main process before forking its
+workers.  The workers write their metrics to files of
+``[metrics] multiproc_dir``/<service>, and the main process serves their
+sum on ``/metrics`` of its ``[metrics] <service>_port``, so the figures
+stay right with ``api_account_workers`` > 1::
+
+    metrics.setup('api', CONF.metrics.api_port)
+
+Without the prometheus_client package, or with ``[metrics] enabled =
+false``, every function of this module does nothing.
+
+Recorded:
+
+* latency, DB statements and DB time of the requests, by route, and the
+  requests in flight, see routing.InstrumentedRoute and
+  :func:`instrument_resources`;
+* connections checked out of the DB pools, and their overflow;
+* hits and misses of the cached DB API functions;
+* AMQP messages consumed, and Celery task durations;
+* deadlock retries, and the user_login records written or lost.
+"""
+
+import contextlib
+import functools
+import glob
+import os
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import importutils
+from sqlalchemy import event
+
+from . import exception
+from . import retry
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+MULTIPROC_ENV = 'PROMETHEUS_MULTIPROC_DIR'
+
+_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_LOCK = threading.Lock()
+_METRICS = None
+
+
+class _Metrics(object):
+
+    def __init__(self, prometheus):
+        buckets = retry.LATENCY_BUCKETS[:-1]
+        histogram = prometheus.Histogram
+        counter = prometheus.Counter
+        gauge = prometheus.Gauge
+
+        self.request_latency = histogram(
+            'account_http_request_duration_seconds',
+            'Latency of the HTTP requests.',
+            ['route', 'method', 'status'], buckets=buckets)
+        self.request_queries = histogram(
+            'account_http_request_db_queries',
+            'SQL statements run by a HTTP request.',
+            ['route'], buckets=_QUERY_BUCKETS)
+        self.request_db_time = histogram(
+            'account_http_request_db_seconds',
+            'Time a HTTP request spent in SQL statements.',
+            ['route'], buckets=buckets)
+        self.in_flight = gauge(
+            'account_http_requests_in_flight',
+            'HTTP requests being served.',
+            ['route'], multiprocess_mode='livesum')
+        self.pool_checked_out = gauge(
+            'account_db_pool_checked_out',
+            'Connections checked out of a DB pool.',
+            ['engine'], multiprocess_mode='livesum')
+        self.pool_overflow = gauge(
+            'account_db_pool_overflow',
+            'Connections of a DB pool beyond its size.',
+            ['engine'], multiprocess_mode='livesum')
+        self.cache_requests = counter(
+            'account_cache_requests',
+            'Lookups of the cached DB API functions.',
+            ['function', 'result'])
+        self.amqp_messages = counter(
+            'account_amqp_messages',
+            'AMQP messages consumed.',
+            ['queue'])
+        self.celery_task_duration = histogram(
+            'account_celery_task_duration_seconds',
+            'Duration of the Celery tasks.',
+            ['task', 'state'], buckets=buckets)
+        self.db_calls = counter(
+            'account_db_calls',
+            'Calls of the DB API functions with a retry policy.',
+            ['function', 'result'])
+        self.db_retries = counter(
+            'account_db_retries',
+            'Deadlock retries of the DB API functions.',
+            ['function'])
+        self.login_records = counter(
+            'account_user_login_records',
+            'user_login records by outcome.',
+            ['result'])
+
+
+def _get():
+    global _METRICS
+    if _METRICS is None:
+        with _LOCK:
+            if _METRICS is None:
+                if not CONF.metrics.enabled:
+                    _METRICS = False
+                else:
+                    prometheus = importutils.try_import('prometheus_client')
+                    _METRICS = (_Metrics(prometheus)
+                                if prometheus is not None else False)
+    return _METRICS or None
+
+
+def setup(service, port=None):
+    """Prepares the metrics of a service, before its workers are forked.
+
+    Empties the files left by a previous run and, with a port, serves the
+    metrics of all the processes of the service on it.
+    """
+    if not CONF.metrics.enabled:
+        return
+    if _METRICS is not None:
+        LOG.warning('Metrics recorded before the setup of %s, those of the '
+                    'main process are left out', service)
+    directory = os.path.join(CONF.metrics.multiproc_dir, service)
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        os.unlink(path)
+    # Read when the metrics are created, so before the first of them.
+    os.environ[MULTIPROC_ENV] = directory
+
+    prometheus = importutils.try_import('prometheus_client')
+    if prometheus is None:
+        LOG.warning('prometheus_client is not installed, no metrics')
+        return
+    if port is not None:
+        from prometheus_client import multiprocess
+
+        registry = prometheus.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        prometheus.start_http_server(port, addr=CONF.metrics.listen,
+                                     registry=registry)
+        LOG.info('Serving the %s metrics on %s:%d', service,
+                 CONF.metrics.listen, port)
+
+
+def process_exited(pid):
+    """Drops the live gauges of a worker process which exited."""
+    if os.environ.get(MULTIPROC_ENV) and _get() is not None:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
+
+
+def _error_status(error):
+    """Status of the response to an exception, 500 if unexpected."""
+    if isinstance(error, exception.Error):
+        return error.kwargs.get('code', error.code)
+    # HTTPException of FastAPI/Starlette, not imported here.
+    status = getattr(error, 'status_code', None)
+    return status if isinstance(status, int) else 500
+
+
+@contextlib.contextmanager
+def track_request(route, method):
+    """Times a request, yields a dict to put its status in.
+
+    A request raising is recorded with the status of the exception.
+    """
+    metrics = _get()
+    if metrics is None:
+        yield {}
+        return
+    result = {'status': 500}
+    in_flight = metrics.in_flight.labels(route)
+    in_flight.inc()
+    start = time.monotonic()
+    try:
+        yield result
+    except Exception as e:
+        result['status'] = _error_status(e)
+        raise
+    finally:
+        in_flight.dec()
+        metrics.request_latency.labels(
+            route, method, str(result['status'])).observe(
+            time.monotonic() - start)
+
+
+def observe_request_queries(route, queries, db_time):
+    metrics = _get()
+    if metrics is not None:
+        metrics.request_queries.labels(route).observe(queries)
+        metrics.request_db_time.labels(route).observe(db_time)
+
+
+def _timed_endpoint(f, route):
+    @functools.wraps(f)
+    def wrapped(*args, **kwargs):
+        with track_request(route, '-') as result:
+            response = f(*args, **kwargs)
+            result['status'] = getattr(response, 'status_code', 200)
+            return response
+    return wrapped
+
+
+def instrument_resources(resources):
+    """Times the endpoints of Trit Resource classes, in place."""
+    for resource in resources:
+        for name, value in list(vars(resource).items()):
+            if name.startswith('_'):
+                continue
+            route = '%s:%s' % (resource.__endpoint__, name)
+            if isinstance(value, staticmethod):
+                setattr(resource, name, staticmethod(
+                    _timed_endpoint(value.__func__, route)))
+            elif callable(value):
+                setattr(resource, name, _timed_endpoint(value, route))
+
+
+def install_pool(engine, name):
+    """Keeps the checked out and overflow gauges of an engine pool."""
+    metrics = _get()
+    if metrics is None or not hasattr(engine.pool, 'checkedout'):
+        return
+    pool = engine.pool
+    checked_out = metrics.pool_checked_out.labels(name)
+    overflow = metrics.pool_overflow.labels(name)
+
+    def update(*args):
+        checked_out.set(pool.checkedout())
+        if hasattr(pool, 'overflow'):
+            overflow.set(max(0, pool.overflow()))
+
+    if not event.contains(engine, 'checkout', update):
+        event.listen(engine, 'checkout', update)
+        event.listen(engine, 'checkin', update)
+
+
+def count_cache(function, result):
+    """Counts a lookup of a cached function, ``hit``, ``miss`` or
+    ``error``.
+    """
+    metrics = _get()
+    if metrics is not None:
+        metrics.cache_requests.labels(function, result).inc()
+
+
+def count_amqp_message(queue):
+    """Counts a message consumed, for the handlers of account-sync."""
+    metrics = _get()
+    if metrics is not None:
+        metrics.amqp_messages.labels(queue).inc()
+
+
+def count_db_call(function, retries, failed):
+    metrics = _get()
+    if metrics is not None:
+        metrics.db_calls.labels(function,
+                                'failure' if failed else 'success').inc()
+        if retries:
+            metrics.db_retries.labels(function).inc(retries)
+
+
+def count_login_records(result, count):
+    """Counts user_login records ``written``, ``dropped`` or ``spilled``."""
+    metrics = _get()
+    if metrics is not None and count:
+        metrics.login_records.labels(result).inc(count)
+
+
+def install_celery():
+    """Times the Celery tasks, and serves them from the worker."""
+    from celery import signals
+
+    starts = {}
+
+    @signals.worker_init.connect(weak=False)
+    def worker_init(**kwargs):
+        setup('celery', CONF.metrics.celery_port)
+
+    @signals.worker_process_shutdown.connect(weak=False)
+    def worker_process_shutdown(pid=None, **kwargs):
+        process_exited(pid or os.getpid())
+
+    @signals.task_prerun.connect(weak=False)
+    def task_prerun(task_id=None, **kwargs):
+        starts[task_id] = time.monotonic()
+
+    @signals.task_postrun.connect(weak=False)
+    def task_postrun(task_id=None, task=None, state=None, **kwargs):
+        start = starts.pop(task_id, None)
+        metrics = _get()
+        if start is not None and metrics is not None:
+            metrics.celery_task_duration.labels(
+                task.name, state or 'UNKNOWN').observe(
+                time.monotonic() - start)
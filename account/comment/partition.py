@@ -0,0 +1,362 @@
+"""Monthly partitions of append-only tables, with retention.
+
+Models with a ``__partition_by__`` column, user_login and user_quota_bill,
+are split by month of that column:
+
+* on MySQL the table is ``PARTITION BY RANGE COLUMNS`` with one partition
+  ``pYYYYMM`` per month and an empty trailing ``pmax``, see the migration
+  004_time_partitions.  New months are split off ``pmax`` ahead of time,
+  which costs nothing as long as it is empty.
+* elsewhere (SQLite) the rows older than ``[partition] sqlite_hot_months``
+  are moved from the table to the per-month table ``<table>_pYYYYMM``.
+
+:meth:`PartitionManager.maintain`, run daily by the maintain_partitions
+beat task, rolls the partitions forward, then writes the months older than
+``[partition] retention_months`` to gzipped NDJSON files of
+``archive_dir`` and drops their partition, which costs no more than
+dropping a table.
+
+``model_query(model, period=(start, end))`` restricts a query to the rows
+created from start (included) to end (excluded), either bound may be None.
+MySQL only reads the partitions overlapping the period, and on SQLite the
+month tables overlapping it are read along with the table.  Queries of a
+partitioned model without a period read every month table on SQLite, so
+that no row is lost to them by being moved.
+"""
+
+import datetime
+import gzip
+import logging
+import os
+import re
+
+from oslo_config import cfg
+from oslo_utils import timeutils
+from sqlalchemy import Column
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+from sqlalchemy import and_
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import union_all
+
+from . import export
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+MAXVALUE_PARTITION = 'pmax'
+
+_PARTITION_NAME = re.compile(r'^p(\d{4})(\d{2})$')
+
+
+def month_start(when):
+    return datetime.datetime(when.year, when.month, 1)
+
+
+def add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime.datetime(index // 12, index % 12 + 1, 1)
+
+
+def months_between(start, end):
+    """The months overlapping [start, end)."""
+    month = month_start(start)
+    while month < end:
+        yield month
+        month = add_months(month, 1)
+
+
+def partition_name(month):
+    return month.strftime('p%Y%m')
+
+
+def _parse_partition_name(name):
+    match = _PARTITION_NAME.match(name or '')
+    if match is None:
+        return None
+    return datetime.datetime(int(match.group(1)), int(match.group(2)), 1)
+
+
+def partition_column(model):
+    """The column a model is partitioned by, None if it is not."""
+    name = getattr(model, '__partition_by__', None)
+    return None if name is None else model.__table__.c[name]
+
+
+def retention_months(table_name):
+    """Months of rows kept in a table, None to keep them forever."""
+    months = CONF.partition.retention_months.get(table_name)
+    return int(months) if months else None
+
+
+def _range(column, start, end):
+    """[start, end) on column, None if both are None."""
+    criteria = []
+    if start is not None:
+        criteria.append(column >= start)
+    if end is not None:
+        criteria.append(column < end)
+    return and_(*criteria) if criteria else None
+
+
+class _RangePartitions(object):
+    """Native RANGE COLUMNS partitions, MySQL."""
+
+    def __init__(self, table, column, engine):
+        self.table = table
+        self.column = column
+        self.engine = engine
+
+    def months(self):
+        with self.engine.connect() as conn:
+            names = conn.execute(text(
+                "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name")
+                .bindparams(name=self.table.name)).scalars().all()
+        if MAXVALUE_PARTITION not in names:
+            LOG.warning('%s is not partitioned, see the migration '
+                        '004_time_partitions', self.table.name)
+            return None
+        return sorted(m for m in map(_parse_partition_name, names) if m)
+
+    def create(self, months):
+        partitions = ["PARTITION %s VALUES LESS THAN ('%s')" %
+                      (partition_name(month),
+                       add_months(month, 1).strftime('%Y-%m-%d'))
+                      for month in months]
+        partitions.append('PARTITION %s VALUES LESS THAN (MAXVALUE)' %
+                          MAXVALUE_PARTITION)
+        with self.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE `%s` REORGANIZE PARTITION %s '
+                              'INTO (%s)' % (self.table.name,
+                                             MAXVALUE_PARTITION,
+                                             ', '.join(partitions))))
+
+    def move(self, before):
+        # The rows are partitioned in place.
+        pass
+
+    def select(self, month):
+        # The whole partition, not the range of the month: the lowest one
+        # also holds every row older than its month, and they are dropped
+        # with it.
+        return select(self.table.c).with_hint(
+            self.table, 'PARTITION (%s)' % partition_name(month), 'mysql')
+
+    def drop(self, month):
+        with self.engine.begin() as conn:
+            conn.execute(text('ALTER TABLE `%s` DROP PARTITION %s' %
+                              (self.table.name, partition_name(month))))
+
+    def sources(self, start, end):
+        return None
+
+
+def _fsync_dir(directory):
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _TablePartitions(object):
+    """Per-month tables, for databases without partitioning."""
+
+    def __init__(self, table, column, engine):
+        self.table = table
+        self.column = column
+        self.engine = engine
+        self._metadata = MetaData()
+
+    def _month_table(self, month):
+        name = '%s_%s' % (self.table.name, partition_name(month))
+        if name not in self._metadata.tables:
+            # Same columns, without the foreign keys and defaults.
+            Table(name, self._metadata,
+                  *[Column(c.name, c.type, primary_key=c.primary_key,
+                           nullable=c.nullable, autoincrement=False)
+                    for c in self.table.columns])
+        return self._metadata.tables[name]
+
+    def months(self):
+        prefix = self.table.name + '_'
+        names = inspect(self.engine).get_table_names()
+        return sorted(m for m in (_parse_partition_name(n[len(prefix):])
+                                  for n in names if n.startswith(prefix))
+                      if m)
+
+    def create(self, months):
+        for month in months:
+            self._month_table(month).create(self.engine, checkfirst=True)
+
+    def move(self, before):
+        """Moves the rows older than before to their month tables."""
+        with self.engine.connect() as conn:
+            oldest = conn.execute(select([self.column]).where(
+                self.column < before).order_by(self.column).limit(1)).scalar()
+        if oldest is None:
+            return
+        for month in months_between(oldest, before):
+            month_table = self._month_table(month)
+            month_table.create(self.engine, checkfirst=True)
+            where = _range(self.column, month, add_months(month, 1))
+            with self.engine.begin() as conn:
+                conn.execute(month_table.insert().from_select(
+                    [c.name for c in self.table.columns],
+                    select(self.table.c).where(where)))
+                moved = conn.execute(self.table.delete().where(where))
+            if moved.rowcount:
+                LOG.info('Moved %d rows of %s to %s', moved.rowcount,
+                         self.table.name, month_table.name)
+
+    def select(self, month):
+        return select(self._month_table(month).c)
+
+    def drop(self, month):
+        self._month_table(month).drop(self.engine, checkfirst=True)
+
+    def sources(self, start, end):
+        first = None if start is None else month_start(start)
+        month_tables = [self._month_table(month) for month in self.months()
+                        if (first is None or month >= first) and
+                        (end is None or month < end)]
+        if not month_tables:
+            return None
+        selects = []
+        for table in [self.table] + month_tables:
+            query = select(table.c)
+            criterion = _range(table.c[self.column.name], start, end)
+            if criterion is not None:
+                query = query.where(criterion)
+            selects.append(query)
+        return union_all(*selects).subquery()
+
+
+class PartitionManager(object):
+    """Partitions of the table of a model with a ``__partition_by__``."""
+
+    def __init__(self, model, engine=None):
+        if partition_column(model) is None:
+            raise ValueError('%s is not partitioned' % model.__name__)
+        self.model = model
+        self.table = model.__table__
+        self.column = partition_column(model)
+        self._engine = engine
+        self._backend = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from . import api
+            self._engine = api.get_engine()
+        return self._engine
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            if self.engine.dialect.name == 'mysql':
+                cls = _RangePartitions
+            else:
+                cls = _TablePartitions
+            self._backend = cls(self.table, self.column, self.engine)
+        return self._backend
+
+    def ensure(self, now=None):
+        """Creates the partitions up to ``[partition] months_ahead``.
+
+        :returns: the months created
+        """
+        existing = self.backend.months()
+        if existing is None:
+            return []
+        current = month_start(now or timeutils.utcnow())
+        last = add_months(current, CONF.partition.months_ahead)
+        # Months are only appended, a gap before the last one stays.
+        first = add_months(existing[-1], 1) if existing else current
+        missing = list(months_between(first, add_months(last, 1)))
+        if missing:
+            self.backend.create(missing)
+            LOG.info('Created the partitions %s of %s',
+                     ', '.join(map(partition_name, missing)), self.table.name)
+        return missing
+
+    def expired(self, now=None):
+        """The months of partitions older than the retention."""
+        retention = retention_months(self.table.name)
+        if retention is None:
+            return []
+        cutoff = add_months(month_start(now or timeutils.utcnow()),
+                            -retention)
+        return [month for month in self.backend.months() or []
+                if month < cutoff]
+
+    def archive(self, month):
+        """Writes the rows of a month to a gzipped NDJSON file.
+
+        :returns: the path of the file
+        """
+        directory = CONF.partition.archive_dir
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, '%s-%s.ndjson.gz' % (
+            self.table.name, month.strftime('%Y%m')))
+        partial = path + '.partial'
+        columns = [c.name for c in self.table.columns]
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(
+                self.backend.select(month))
+            rows = (dict(zip(columns, row)) for row in result)
+            with open(partial, 'wb') as raw:
+                # Closed first, it writes the last block and the trailer.
+                with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                    for chunk in export.serialize(rows, columns, 'ndjson'):
+                        f.write(chunk)
+                raw.flush()
+                os.fsync(raw.fileno())
+        _fsync_dir(directory)
+        os.rename(partial, path)
+        # The partition is dropped next, the archive must be on disk.
+        _fsync_dir(directory)
+        return path
+
+    def maintain(self, now=None):
+        """Rolls the partitions forward, archives and drops the expired ones.
+
+        :returns: the months created and dropped
+        """
+        now = now or timeutils.utcnow()
+        hot = add_months(month_start(now),
+                         1 - CONF.partition.sqlite_hot_months)
+        retention = retention_months(self.table.name)
+        if retention is not None:
+            hot = max(hot, add_months(month_start(now), -retention))
+        self.backend.move(hot)
+        created = self.ensure(now)
+        dropped = []
+        for month in self.expired(now):
+            path = self.archive(month)
+            self.backend.drop(month)
+            LOG.info('Archived the partition %s of %s to %s',
+                     partition_name(month), self.table.name, path)
+            dropped.append(month)
+        return created, dropped
+
+
+def restrict(query, model, start=None, end=None):
+    """Restricts a query of a partitioned model to [start, end).
+
+    Without bounds, the query reads the rows of every month: on SQLite
+    those moved to the month tables too.
+    """
+    column = partition_column(model)
+    if column is None:
+        raise ValueError('%s is not partitioned' % model.__name__)
+    sources = PartitionManager(model, query.session.get_bind(model)) \
+        .backend.sources(start, end)
+    if sources is None:
+        criterion = _range(getattr(model, column.name), start, end)
+        return query if criterion is None else query.filter(criterion)
+    # The criteria already set are adapted to the month tables as well.
+    return query.enable_assertions(False).select_entity_from(sources)
@@ -0,0 +1,213 @@
+"""Per-request SQL statistics, repeated (N+1) and slow statement logs.
+
+:func:`install` hooks the cursor events of an engine, it is done for the
+engines of api.py, async_api.py and the replicas.  Every statement is then
+timed and, when run for a request served by a routing.InstrumentedRoute,
+counted on the :class:`RequestStats` of the request:
+
+* a statement run ``[database] repeated_query_threshold`` times in the same
+  request, with any parameters, is logged once as a likely N+1 query;
+* a statement slower than ``[database] slow_query_threshold`` seconds is
+  logged with its route.
+
+Both logs come with the last ``[database] query_stack_depth`` frames of
+the application stack leading to the statement.
+
+With ``[service] debug`` the responses carry the ``X-DB-Queries``,
+``X-DB-Time`` (milliseconds) and ``X-DB-Repeated`` (most runs of a same
+statement) headers.  In any case the statements, their latencies and the
+queries of each route are recorded, see :func:`get_stats`, and the requests
+are timed in the Prometheus metrics, see metrics.py.
+
+Routers opt in by building their routes with routing.InstrumentedRoute::
+
+    from account.comment.routing import InstrumentedRoute as Route
+"""
+
+import bisect
+import collections
+import contextlib
+import contextvars
+import os
+import re
+import threading
+import time
+import traceback
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from sqlalchemy import event
+
+from .retry import LATENCY_BUCKETS
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# Placeholders lists of IN clauses, expanded to one per value.
+_IN_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s)\s*,)+\s*'
+                      r'(?:\?|%s|%\(\w+\)s)\s*\)')
+_SPACES = re.compile(r'\s+')
+
+# Only the frames of the account package are logged.
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + \
+    os.sep
+
+_current = contextvars.ContextVar('querystats_request', default=None)
+
+
+def statement_shape(statement):
+    """The statement with its IN lists collapsed and spaces normalized."""
+    return _SPACES.sub(' ', _IN_LIST.sub('(?)', statement)).strip()
+
+
+def _trim(statement, length=300):
+    statement = _SPACES.sub(' ', statement).strip()
+    if len(statement) > length:
+        return statement[:length] + '...'
+    return statement
+
+
+def _stack():
+    frames = [frame for frame in traceback.extract_stack()
+              if frame.filename.startswith(_APP_DIR) and
+              frame.filename != os.path.abspath(__file__)]
+    return ''.join(traceback.format_list(
+        frames[-CONF.database.query_stack_depth:]))
+
+
+class RequestStats(object):
+    """Statements of one request."""
+
+    def __init__(self, route):
+        self.route = route
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = collections.Counter()
+
+    @property
+    def max_repeated(self):
+        return max(self.shapes.values()) if self.shapes else 0
+
+    def add(self, shape, elapsed):
+        self.queries += 1
+        self.db_time += elapsed
+        self.shapes[shape] += 1
+        return self.shapes[shape]
+
+
+class _Histogram(object):
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+
+    def to_dict(self):
+        return {'count': self.count,
+                'sum': self.sum,
+                'buckets': list(zip(LATENCY_BUCKETS, self.buckets))}
+
+
+_LOCK = threading.Lock()
+_STATEMENTS = _Histogram()
+_ROUTES = collections.defaultdict(lambda: {'requests': 0, 'queries': 0,
+                                           'db_time': 0.0})
+_COUNTERS = {'slow': 0, 'repeated': 0}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context,
+                           executemany):
+    conn.info.setdefault('querystats_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    elapsed = time.perf_counter() - conn.info['querystats_start'].pop()
+    request = _current.get()
+    runs = 0
+    if request is not None:
+        runs = request.add(statement_shape(statement), elapsed)
+    with _LOCK:
+        _STATEMENTS.observe(elapsed)
+
+    route = request.route if request is not None else '-'
+    slow = CONF.database.slow_query_threshold
+    if slow and elapsed >= slow:
+        with _LOCK:
+            _COUNTERS['slow'] += 1
+        LOG.warning('Slow query (%.3fs) on %s: %s\n%s', elapsed, route,
+                    _trim(statement), _stack())
+    repeated = CONF.database.repeated_query_threshold
+    if repeated and runs == repeated:
+        with _LOCK:
+            _COUNTERS['repeated'] += 1
+        LOG.warning('Query run %d times on %s, likely N+1: %s\n%s', runs,
+                    route, _trim(statement), _stack())
+
+
+def _handle_error(context):
+    # after_cursor_execute is skipped on errors.
+    starts = context.connection.info.get('querystats_start') \
+        if context.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+def install(engine):
+    """Hooks the statement events of an engine, once."""
+    if event.contains(engine, 'before_cursor_execute',
+                      _before_cursor_execute):
+        return
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+def current():
+    """The statistics of the request being served, None outside of one."""
+    return _current.get()
+
+
+@contextlib.contextmanager
+def request(route):
+    """Counts the statements run within on the yielded RequestStats."""
+    stats = RequestStats(route)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        # Statements of a streamed body run after this point, they are only
+        # timed.
+        _current.reset(token)
+        _record_request(stats)
+
+
+def _record_request(stats):
+    with _LOCK:
+        route = _ROUTES[stats.route]
+        route['requests'] += 1
+        route['queries'] += stats.queries
+        route['db_time'] += stats.db_time
+
+
+def get_stats():
+    """Returns the statement latencies, log counters and route totals."""
+    with _LOCK:
+        return {'statements': _STATEMENTS.to_dict(),
+                'slow': _COUNTERS['slow'],
+                'repeated': _COUNTERS['repeated'],
+                'routes': {route: dict(totals)
+                           for route, totals in _ROUTES.items()}}
+
+
+def reset_stats():
+    global _STATEMENTS
+    with _LOCK:
+        _STATEMENTS = _Histogram()
+        _ROUTES.clear()
+        _COUNTERS.update(slow=0, repeated=0)
@@ -0,0 +1,167 @@
+"""Read replica routing for ``model_query(use_slave=True)``.
+
+The replicas are ``[database] slave_connection`` plus every URL of
+``[database] slave_connections``.  Reads are spread round-robin over the
+replicas whose replication lag, measured every
+``[database] replica_lag_check_interval`` seconds, is at most
+``[database] replica_max_lag`` seconds.  They fall back to the primary when
+no replica qualifies.
+
+Reads also go to the primary for ``replica_max_lag`` seconds after the
+current context (request, task or thread) wrote to the primary, so a client
+always reads its own writes.  The writes are noticed by the listener
+:func:`install` hooks on the primary engines when they are created.
+"""
+
+import contextvars
+import itertools
+import os
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_db.sqlalchemy import session as db_session
+from oslo_log import log as logging
+from sqlalchemy import event
+from sqlalchemy import text
+
+from . import metrics
+from . import querystats
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# monotonic time of the last write to the primary in this context
+_LAST_WRITE = contextvars.ContextVar('account_db_last_write', default=None)
+
+
+def replica_connections():
+    connections = []
+    if CONF.database.slave_connection:
+        connections.append(CONF.database.slave_connection)
+    for connection in CONF.database.slave_connections:
+        if connection and connection not in connections:
+            connections.append(connection)
+    return connections
+
+
+def mark_write():
+    """Routes the reads of the current context to the primary for a while."""
+    _LAST_WRITE.set(time.monotonic())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context,
+                          executemany):
+    if context is not None and (context.isinsert or context.isupdate or
+                                context.isdelete):
+        mark_write()
+
+
+def install(engine):
+    """Marks the writes through a primary engine, once."""
+    if not event.contains(engine, 'after_cursor_execute',
+                          _after_cursor_execute):
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _wrote_recently():
+    last_write = _LAST_WRITE.get()
+    return (last_write is not None and
+            time.monotonic() - last_write < CONF.database.replica_max_lag)
+
+
+class Replica(object):
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.facade = db_session.EngineFacade(connection)
+        querystats.install(self.facade.get_engine())
+        metrics.install_pool(self.facade.get_engine(), 'replica')
+        # None until measured, then seconds of lag or None if broken
+        self.lag = None
+        self.healthy = False
+
+    def measure_lag(self):
+        engine = self.facade.get_engine()
+        try:
+            if engine.dialect.name != 'mysql':
+                lag = 0
+            else:
+                with engine.connect() as conn:
+                    status = conn.execute(
+                        text('SHOW SLAVE STATUS')).mappings().first()
+                if status is None:
+                    # Not replicating from anything, so never behind.
+                    lag = 0
+                else:
+                    lag = status.get('Seconds_Behind_Master',
+                                     status.get('Seconds_Behind_Source'))
+        except Exception:
+            LOG.warning('Lag check of replica %r failed', engine.url,
+                        exc_info=True)
+            lag = None
+
+        self.lag = lag
+        self.healthy = (lag is not None and
+                        lag <= CONF.database.replica_max_lag)
+
+
+class ReplicaRouter(object):
+    """Picks the session serving a read.
+
+    :param get_primary_session: factory of the primary sessions
+    :param connections: URLs of the replicas
+    """
+
+    def __init__(self, get_primary_session, connections):
+        self._get_primary_session = get_primary_session
+        self.replicas = [Replica(connection) for connection in connections]
+        self._cycle = itertools.cycle(self.replicas)
+        self._lock = threading.Lock()
+        self._checker_pid = None
+
+    def check_lag(self):
+        for replica in self.replicas:
+            replica.measure_lag()
+
+    def _run_checker(self):
+        while True:
+            self.check_lag()
+            time.sleep(CONF.database.replica_lag_check_interval)
+
+    def _ensure_checker(self):
+        # The checker thread does not survive a fork, every worker runs its
+        # own.
+        if self._checker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._checker_pid == os.getpid():
+                return
+            self.check_lag()
+            thread = threading.Thread(target=self._run_checker,
+                                      name='replica-lag-checker',
+                                      daemon=True)
+            thread.start()
+            self._checker_pid = os.getpid()
+
+    def get_replica(self):
+        """Returns the next replica fit to serve reads, None if none is."""
+        if not self.replicas or _wrote_recently():
+            return None
+        self._ensure_checker()
+        with self._lock:
+            for _i in range(len(self.replicas)):
+                replica = next(self._cycle)
+                if replica.healthy:
+                    return replica
+        return None
+
+    def get_session(self, **kwargs):
+        replica = self.get_replica()
+        if replica is None:
+            return self._get_primary_session(**kwargs)
+        return replica.facade.get_session(**kwargs)
+
+    def dispose(self, close=True):
+        for replica in self.replicas:
+            replica.facade.get_engine().dispose(close=close)
@@ -0,0 +1,199 @@
+"""Retry policy for DB API calls.
+
+:class:`RetryPolicy` retries a call failing with one of the given exceptions
+(deadlocks by default) with exponential backoff and full jitter, so a
+deadlock storm spreads its retries out instead of hammering the database in
+lock step.  Retries stop once ``max_attempts`` calls were made or
+``max_elapsed`` seconds went by, and the last error is raised.
+
+Every decorated function has its calls, retries, give-ups and latencies
+(including the retries) recorded, see :func:`get_stats`.
+
+::
+
+    @retry.RetryPolicy()
+    def update_quota(...):
+        ...
+
+Coroutine functions are supported and sleep with ``asyncio.sleep``.
+"""
+
+import asyncio
+import bisect
+import functools
+import random
+import threading
+import time
+
+from oslo_config import cfg
+from oslo_db import exception as db_exc
+from oslo_log import log as logging
+
+from . import metrics
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, float('inf'))
+
+
+class CallStats(object):
+    """Counters and latency histogram of one decorated function."""
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+
+    def observe(self, elapsed):
+        self.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS,
+                                                elapsed)] += 1
+        self.latency_sum += elapsed
+
+    def to_dict(self):
+        return {'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'latency_sum': self.latency_sum,
+                'latency_buckets': list(zip(LATENCY_BUCKETS,
+                                            self.latency_buckets))}
+
+
+_LOCK = threading.Lock()
+_STATS = {}
+
+
+def _record(name, retries, failed, elapsed):
+    with _LOCK:
+        stats = _STATS.get(name)
+        if stats is None:
+            stats = _STATS[name] = CallStats()
+        stats.calls += 1
+        stats.retries += retries
+        stats.failures += failed
+        stats.observe(elapsed)
+    metrics.count_db_call(name, retries, failed)
+
+
+def get_stats():
+    """Returns the statistics of every decorated function, by name."""
+    with _LOCK:
+        return {name: stats.to_dict() for name, stats in _STATS.items()}
+
+
+def reset_stats():
+    with _LOCK:
+        _STATS.clear()
+
+
+class RetryPolicy(object):
+    """Decorator retrying a call with jittered exponential backoff.
+
+    Unset parameters default to the ``[database] deadlock_retry_*``
+    options, read when the call is made.
+
+    :param exceptions: exception classes worth a retry
+    :param max_attempts: total number of calls, retries included
+    :param max_elapsed: seconds after which no retry is attempted
+    :param interval: backoff of the first retry
+    :param max_interval: upper bound of the backoff
+    """
+
+    def __init__(self, exceptions=(db_exc.DBDeadlock,), max_attempts=None,
+                 max_elapsed=None, interval=None, max_interval=None):
+        self.exceptions = tuple(exceptions)
+        self._max_attempts = max_attempts
+        self._max_elapsed = max_elapsed
+        self._interval = interval
+        self._max_interval = max_interval
+
+    @property
+    def max_attempts(self):
+        if self._max_attempts is None:
+            return CONF.database.deadlock_retry_max_attempts
+        return self._max_attempts
+
+    @property
+    def max_elapsed(self):
+        if self._max_elapsed is None:
+            return CONF.database.deadlock_retry_max_elapsed
+        return self._max_elapsed
+
+    @property
+    def interval(self):
+        if self._interval is None:
+            return CONF.database.deadlock_retry_interval
+        return self._interval
+
+    @property
+    def max_interval(self):
+        if self._max_interval is None:
+            return CONF.database.deadlock_retry_max_interval
+        return self._max_interval
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number ``attempt`` (from 1)."""
+        ceiling = min(self.max_interval, self.interval * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+    def _next_delay(self, name, attempt, start, error):
+        """Returns how long to wait before retrying, None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt)
+        if time.monotonic() - start + delay > self.max_elapsed:
+            return None
+        LOG.warning("%(error)s when running '%(func_name)s': retrying in "
+                    "%(delay).3fs (attempt %(attempt)d/%(max)d)",
+                    {'error': type(error).__name__, 'func_name': name,
+                     'delay': delay, 'attempt': attempt,
+                     'max': self.max_attempts})
+        return delay
+
+    def __call__(self, f):
+        name = '%s.%s' % (f.__module__, f.__qualname__)
+
+        if asyncio.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def async_wrapped(*args, **kwargs):
+                start = time.monotonic()
+                attempt = 0
+                while True:
+                    attempt += 1
+                    try:
+                        result = await f(*args, **kwargs)
+                    except self.exceptions as e:
+                        delay = self._next_delay(name, attempt, start, e)
+                        if delay is None:
+                            _record(name, attempt - 1, 1,
+                                    time.monotonic() - start)
+                            raise
+                        await asyncio.sleep(delay)
+                        continue
+                    _record(name, attempt - 1, 0, time.monotonic() - start)
+                    return result
+            return async_wrapped
+
+        @functools.wraps(f)
+        def wrapped(*args, **kwargs):
+            start = time.monotonic()
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    result = f(*args, **kwargs)
+                except self.exceptions as e:
+                    delay = self._next_delay(name, attempt, start, e)
+                    if delay is None:
+                        _record(name, attempt - 1, 1,
+                                time.monotonic() - start)
+                        raise
+                    time.sleep(delay)
+                    continue
+                _record(name, attempt - 1, 0, time.monotonic() - start)
+                return result
+        return wrapped
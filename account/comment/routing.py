@@ -0,0 +1,43 @@
+"""FastAPI route of the account routers.
+
+Kept apart from querystats.py so that the DB layer, and the Celery workers
+with it, do not import FastAPI.
+"""
+
+from fastapi.routing import APIRoute
+from oslo_config import cfg
+
+from . import metrics
+from . import querystats
+
+CONF = cfg.CONF
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute counting the statements of each request, see
+    querystats.py, and timing it, see metrics.py.
+    """
+
+    def get_route_handler(self):
+        handler = super(InstrumentedRoute, self).get_route_handler()
+        route = '%s %s' % ('|'.join(sorted(self.methods)), self.path_format)
+
+        async def instrumented_handler(request):
+            with querystats.request(route) as stats:
+                try:
+                    with metrics.track_request(self.path_format,
+                                               request.method) as result:
+                        response = await handler(request)
+                        result['status'] = response.status_code
+                finally:
+                    metrics.observe_request_queries(self.path_format,
+                                                    stats.queries,
+                                                    stats.db_time)
+            if CONF.service.debug:
+                response.headers['X-DB-Queries'] = str(stats.queries)
+                response.headers['X-DB-Time'] = '%.1f' % (stats.db_time *
+                                                          1000)
+                response.headers['X-DB-Repeated'] = str(stats.max_repeated)
+            return response
+
+        return instrumented_handler
@@ -0,0 +1,101 @@
+"""Substring search on indexed columns, the ``search`` filter comparator.
+
+A model opts in by listing the searched columns, in the order of the
+FULLTEXT index covering them all::
+
+    class User(BASE, satelliteBase):
+        __search_columns__ = ('username', 'real_name', 'email')
+
+and ``hints.add_filter('email', 'example', comparator='search')`` then
+lists the users whose email contains ``example``.  The virtual name
+``search`` matches rows where any of the searched columns does.
+
+On MySQL the index is an n-gram FULLTEXT one, so ``MATCH ... AGAINST`` with
+the value as a phrase finds the candidate rows through the index.  These
+are checked again with ``LIKE`` for exact substring semantics, which is
+cheap on the few candidates.  The index must have been built without
+stopwords, see migration 002_user_search.  Values shorter than
+``[database] search_ngram_token_size`` and other databases fall back to a
+plain ``ILIKE '%value%'``.
+"""
+
+from oslo_config import cfg
+from sqlalchemy import bindparam
+from sqlalchemy import Float
+from sqlalchemy import literal_column
+from sqlalchemy import or_
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql import expression
+
+CONF = cfg.CONF
+
+# Name of the filter searching all the search columns of a model
+SEARCH_ALL = 'search'
+
+
+class MatchAgainst(expression.ColumnElement):
+    """``MATCH (columns) AGAINST (value IN BOOLEAN MODE)``, the relevance."""
+
+    type = Float()
+    inherit_cache = False
+
+    def __init__(self, columns, value):
+        self.columns = columns
+        self.value = bindparam('search', value, unique=True)
+
+
+@compiles(MatchAgainst)
+def _compile_match_against(element, compiler, **kw):
+    return 'MATCH (%s) AGAINST (%s IN BOOLEAN MODE)' % (
+        ', '.join(compiler.process(column, **kw)
+                  for column in element.columns),
+        compiler.process(element.value, **kw))
+
+
+def backend_name():
+    return make_url(CONF.database.connection).get_backend_name()
+
+
+def search_columns(model):
+    return getattr(model, '__search_columns__', ())
+
+
+def is_searchable(model, name):
+    columns = search_columns(model)
+    return bool(columns) and (name == SEARCH_ALL or name in columns)
+
+
+def _phrase(value):
+    # Quotes make it a phrase: adjacent n-grams, in order.  Nothing in
+    # the value is a boolean mode operator then, except quotes.
+    return '"%s"' % value.replace('"', ' ')
+
+
+def search_clause(model, name, value, backend=None):
+    """Returns the criterion of a ``search`` filter.
+
+    :param model: searchable model
+    :param name: one of the search columns, or ``search`` for all of them
+    :param value: substring to look for
+    :param backend: database backend name, defaults to the configured one
+    """
+    if backend is None:
+        backend = backend_name()
+    if name == SEARCH_ALL:
+        columns = [getattr(model, c) for c in search_columns(model)]
+    else:
+        columns = [getattr(model, name)]
+
+    value = str(value)
+    pattern = '%%%s%%' % value
+    if (backend != 'mysql' or
+            len(value) < CONF.database.search_ngram_token_size):
+        return or_(*[column.ilike(pattern) for column in columns])
+
+    # The MySQL collations compare case insensitively already, LIKE rather
+    # than ILIKE keeps lower() off the columns.
+    index_columns = [getattr(model, c) for c in search_columns(model)]
+    match = MatchAgainst(index_columns, _phrase(value))
+    return ((match > literal_column('0')) &
+            or_(*[column.like(pattern) for column in columns]))
@@ -1,12 +1,9 @@
 """ Utils helper """
 import collections
-from oslo_utils import strutils
 from oslo_config import cfg
 from oslo_log import log
 import jsonutils
-import passlib.hash
 import six
-import requests
 
 from decimal import Decimal
 
@@ -49,6 +46,32 @@ class SmarterEncoder(jsonutils.json.JSONEncoder):
         return super(SmarterEncoder, self).default(obj)
 
 
+def hash_password(password, rounds=None):
+    """Hashes a password with sha512_crypt.
+
+    :param rounds: cost of the hash, defaults to
+                   ``[identity] password_hash_rounds``
+    """
+    import passlib.hash
+
+    if rounds is None:
+        rounds = CONF.identity.password_hash_rounds
+    return passlib.hash.sha512_crypt.using(rounds=rounds).hash(password)
+
+
+def check_password(password, hashed):
+    """Verifies a password against its hash, False if either is missing."""
+    import passlib.hash
+
+    if password is None or hashed is None:
+        return False
+    try:
+        return passlib.hash.sha512_crypt.verify(password, hashed)
+    except ValueError:
+        # Not a sha512_crypt hash
+        return False
+
+
 def filter_model_result(ref):
     # ref.pop('deleted', None)
     ref.pop('deleted_at', None)
@@ -63,6 +86,8 @@ def attr_as_boolean(val_attr):
     meaning True.
 
     """
+    from oslo_utils import strutils
+
     return strutils.bool_from_string(val_attr, default=True)
 
 
@@ -113,6 +138,8 @@ def solarclient(request=None):
 
 
 def notify_third_user_expt_success(third_user_id, cur_uuid, course_uuid):
+    import requests
+
     headers = {'Content-Type': 'application/json'}
     url = "https://bizwebcast.intel.cn/dev_api/api/CourseExperimenta/UpdateExpLog"
     params = {
@@ -19,9 +19,12 @@
 SQLAlchemy models for nova data.
 """
 
+import operator
+
 from oslo_config import cfg
 from oslo_db.sqlalchemy import models
-from satellite.common import jsonutils
+from account.comment import cache
+from account.comment import jsonutils
 from oslo_utils import timeutils
 import six
 from sqlalchemy import (Table, Column, Index, Integer, BigInteger, Enum, String,
@@ -41,6 +44,33 @@ def MediumText():
     return Text().with_variant(MEDIUMTEXT(), 'mysql')
 
 
+def column_accessor(model, exclude=()):
+    """Returns the column names of a model and a getter of their values.
+
+    Both are built once per model: the getter is an ``attrgetter`` returning
+    the values of the columns of an instance as a tuple, in the order of the
+    names.
+
+    :param model: model class
+    :param exclude: tuple of column names to leave out
+    """
+    accessors = model.__dict__.get('_column_accessors')
+    if accessors is None:
+        accessors = {}
+        model._column_accessors = accessors
+    accessor = accessors.get(exclude)
+    if accessor is None:
+        names = tuple(c.name for c in model.__table__.columns
+                      if c.name not in exclude)
+        if len(names) == 1:
+            getter = operator.attrgetter(names[0])
+            accessor = (names, lambda obj: (getter(obj),))
+        else:
+            accessor = (names, operator.attrgetter(*names))
+        accessors[exclude] = accessor
+    return accessor
+
+
 class JsonBlob(TypeDecorator):
 
     impl = Text
@@ -99,12 +129,13 @@ class satelliteBase(SoftDeleteMixin,
         return copy
 
     def save(self, session=None):
-        from satellite.db.sqlalchemy import api
+        from account.comment import api
 
         if session is None:
             session = api.get_session()
 
         super(satelliteBase, self).save(session=session)
+        cache.invalidate_on_commit(session, self.__table__.name)
 
     @classmethod
     def from_dict(cls, d):
@@ -113,10 +144,8 @@ class satelliteBase(SoftDeleteMixin,
 
     def to_dict(self):
         """Returns the model's attributes as a dictionary."""
-        d = dict()
-        for c in self.__table__.columns:
-            d[c.name] = getattr(self, c.name)
-        return d
+        names, getter = column_accessor(type(self))
+        return dict(zip(names, getter(self)))
 
     def __getitem__(self, item):
         if item in self.extra:
@@ -172,10 +201,8 @@ class ExptPlatformBase(models.ModelBase):
 
     def to_dict(self):
         """Returns the model's attributes as a dictionary."""
-        d = dict()
-        for c in self.__table__.columns:
-            d[c.name] = getattr(self, c.name)
-        return d
+        names, getter = column_accessor(type(self))
+        return dict(zip(names, getter(self)))
 
     def __getitem__(self, item):
         if item in self.extra:
@@ -189,7 +216,7 @@ class DictBase(satelliteBase):
         """Returns a model instance from a dictionary."""
         new_d = d.copy()
 
-        col_names = [c.name for c in cls.__table__.columns]
+        col_names = column_accessor(cls)[0]
         new_d['extra'] = {k: new_d.pop(k) for k in six.iterkeys(d)
                           if k not in col_names and k != 'extra'}
         return cls(**new_d)
@@ -197,9 +224,8 @@ class DictBase(satelliteBase):
     def to_dict(self, include_extra_dict=False):
         """Returns the model's attributes as a dictionary."""
         d = self.extra.copy()
-        for c in self.__table__.columns:
-            if c.name != 'extra':
-                d[c.name] = getattr(self, c.name)
+        names, getter = column_accessor(type(self), exclude=('extra',))
+        d.update(zip(names, getter(self)))
 
         if include_extra_dict:
             d['extra'] = self.extra.copy()
@@ -251,10 +277,8 @@ class CourseBase(models.ModelBase):
 
     def to_dict(self):
         """Returns the model's attributes as a dictionary."""
-        d = dict()
-        for c in self.__table__.columns:
-            d[c.name] = getattr(self, c.name)
-        return d
+        names, getter = column_accessor(type(self))
+        return dict(zip(names, getter(self)))
 
     def to_sub_dict(self):
         d = dict()
@@ -308,11 +332,13 @@ class ExptPlatformBase(models.ModelBase):
         return copy
 
     def save(self, session=None):
+        from account.comment import api
 
         if session is None:
             session = api.get_session()
 
         super(ExptPlatformBase, self).save(session=session)
+        cache.invalidate_on_commit(session, self.__table__.name)
 
     @classmethod
     def from_dict(cls, d):
@@ -321,10 +347,8 @@ class ExptPlatformBase(models.ModelBase):
 
     def to_dict(self):
         """Returns the model's attributes as a dictionary."""
-        d = dict()
-        for c in self.__table__.columns:
-            d[c.name] = getattr(self, c.name)
-        return d
+        names, getter = column_accessor(type(self))
+        return dict(zip(names, getter(self)))
 
     def __getitem__(self, item):
         if item in self.extra:
@@ -0,0 +1,40 @@
+"""n-gram FULLTEXT index for the user search, see account/comment/search.py.
+
+The column list must stay the one of User.__search_columns__, in the same
+order.  Other databases have no such index and search with ILIKE.
+
+InnoDB drops the n-grams containing a stopword from a FULLTEXT index, with
+the default stopword list ``at``, ``be``, ``in``, ... so a search for
+``li`` would never find ``lina``.  The stopwords of an index are the ones
+in effect when it is built: the index is built with
+``innodb_ft_enable_stopword`` turned off for the session, and the upgrade
+fails rather than build an index with stopwords.  An index built another
+way must be rebuilt likewise, the search is wrong otherwise.
+"""
+
+INDEX_NAME = 'user_search_ft'
+COLUMNS = ('username', 'real_name', 'email', 'cellphone', 'career_id')
+
+
+def upgrade(migrate_engine):
+    if migrate_engine.name != 'mysql':
+        return
+    with migrate_engine.connect() as conn:
+        conn.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        enabled = conn.execute(
+            "SELECT @@SESSION.innodb_ft_enable_stopword").scalar()
+        if int(enabled):
+            raise RuntimeError(
+                'innodb_ft_enable_stopword could not be turned off, the '
+                'FULLTEXT index %s would miss the n-grams of stopwords'
+                % INDEX_NAME)
+        conn.execute(
+            "ALTER TABLE `user` ADD FULLTEXT INDEX %s (%s) WITH PARSER ngram"
+            % (INDEX_NAME, ', '.join('`%s`' % c for c in COLUMNS)))
+
+
+def downgrade(migrate_engine):
+    if migrate_engine.name != 'mysql':
+        return
+    migrate_engine.execute(
+        "ALTER TABLE `user` DROP INDEX %s" % INDEX_NAME)
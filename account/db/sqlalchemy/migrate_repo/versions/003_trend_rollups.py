@@ -0,0 +1,34 @@
+"""Watermarks of the user_history_trend rollups, see app/user/trend.py."""
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, \
+    Table
+
+
+def upgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    rollup_watermark = Table(
+        'rollup_watermark', meta,
+        Column('name', String(64), primary_key=True, comment='被汇总的表'),
+        Column('last_id', Integer, nullable=False, default=0,
+               comment='已汇总的最大id'),
+        Column('updated_at', DateTime),
+        mysql_engine='InnoDB',
+        mysql_charset='utf8'
+    )
+    rollup_watermark.create()
+
+    user_history_trend = Table('user_history_trend', meta, autoload=True)
+    Index('uniq_user_history_trend0date_type', user_history_trend.c.date,
+          user_history_trend.c.type, unique=True).create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+
+    user_history_trend = Table('user_history_trend', meta, autoload=True)
+    Index('uniq_user_history_trend0date_type', user_history_trend.c.date,
+          user_history_trend.c.type, unique=True).drop(migrate_engine)
+    Table('rollup_watermark', meta, autoload=True).drop()
@@ -0,0 +1,76 @@
+"""Monthly partitions of user_login and user_quota_bill, see
+account/comment/partition.py.
+
+MySQL wants the partitioning column in every unique key and no foreign
+key on partitioned tables: created_at joins the primary key and the
+foreign key of user_login.user_uuid is dropped, its index stays.  Other
+databases get per-month tables from the partition manager instead.
+"""
+
+import datetime
+
+from sqlalchemy import inspect
+
+TABLES = ('user_login', 'user_quota_bill')
+
+
+def _next_month(month):
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def _bounds(migrate_engine, table):
+    """Upper bounds of the months from the oldest row to 3 months ahead,
+    the partition manager takes over from there.
+    """
+    oldest = migrate_engine.execute(
+        "SELECT MIN(created_at) FROM `%s`" % table).scalar()
+    now = datetime.datetime.utcnow()
+    last = datetime.datetime(now.year, now.month, 1)
+    for _i in range(3):
+        last = _next_month(last)
+    oldest = oldest or now
+    bound = _next_month(datetime.datetime(oldest.year, oldest.month, 1))
+    bounds = []
+    while bound <= _next_month(last):
+        bounds.append(bound)
+        bound = _next_month(bound)
+    return bounds
+
+
+def upgrade(migrate_engine):
+    if migrate_engine.name != 'mysql':
+        return
+    for fk in inspect(migrate_engine).get_foreign_keys('user_login'):
+        migrate_engine.execute("ALTER TABLE `user_login` DROP FOREIGN KEY %s"
+                               % fk['name'])
+
+    for table in TABLES:
+        migrate_engine.execute(
+            "UPDATE `%s` SET created_at = UTC_TIMESTAMP() "
+            "WHERE created_at IS NULL" % table)
+        migrate_engine.execute(
+            "ALTER TABLE `%s` MODIFY created_at DATETIME NOT NULL, "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)" % table)
+        # Each partition holds the month before its bound.
+        partitions = ["PARTITION p%s VALUES LESS THAN ('%s')" %
+                      ((bound - datetime.timedelta(days=1)).strftime('%Y%m'),
+                       bound.strftime('%Y-%m-%d'))
+                      for bound in _bounds(migrate_engine, table)]
+        partitions.append('PARTITION pmax VALUES LESS THAN (MAXVALUE)')
+        migrate_engine.execute(
+            "ALTER TABLE `%s` PARTITION BY RANGE COLUMNS(created_at) (%s)" %
+            (table, ', '.join(partitions)))
+
+
+def downgrade(migrate_engine):
+    if migrate_engine.name != 'mysql':
+        return
+    for table in TABLES:
+        migrate_engine.execute(
+            "ALTER TABLE `%s` REMOVE PARTITIONING" % table)
+        migrate_engine.execute(
+            "ALTER TABLE `%s` MODIFY created_at DATETIME NULL, "
+            "DROP PRIMARY KEY, ADD PRIMARY KEY (id)" % table)
+    migrate_engine.execute(
+        "ALTER TABLE `user_login` ADD FOREIGN KEY (user_uuid) "
+        "REFERENCES `user` (uuid)")
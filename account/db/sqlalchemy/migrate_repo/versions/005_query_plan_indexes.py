@@ -0,0 +1,52 @@
+"""Indexes of the DB API query shapes, see tools/check_query_plans.py.
+
+Without them the quota lookups, the logins of a user, the uniqueness
+lookups of the user imports and the listings in the default
+(created_at, id) order read the whole table, and sort it.
+"""
+
+from sqlalchemy import Index, MetaData, Table
+
+# table: (index name, columns)
+INDEXES = {
+    'user': [
+        ('user_username_idx', ('username',)),
+        # The email and career_id lookups of importer.UserImporter._taken
+        ('user_email_idx', ('email',)),
+        ('user_career_id_idx', ('career_id',)),
+        ('user_created_at_id_idx', ('created_at', 'id')),
+    ],
+    'user_quota': [
+        ('user_quota_user_uuid_resource_id_idx', ('user_uuid',
+                                                  'resource_id')),
+    ],
+    'user_quota_bill': [
+        # The bills of a quota come in the default order as well.
+        ('user_quota_bill_user_quota_id_created_at_idx',
+         ('user_quota_id', 'created_at', 'id')),
+        ('user_quota_bill_created_at_id_idx', ('created_at', 'id')),
+    ],
+    'user_login': [
+        ('user_login_user_uuid_created_at_idx', ('user_uuid', 'created_at')),
+        ('user_login_created_at_id_idx', ('created_at', 'id')),
+    ],
+}
+
+
+def _indexes(migrate_engine):
+    meta = MetaData()
+    meta.bind = migrate_engine
+    for table_name, indexes in INDEXES.items():
+        table = Table(table_name, meta, autoload=True)
+        for name, columns in indexes:
+            yield Index(name, *[table.c[column] for column in columns])
+
+
+def upgrade(migrate_engine):
+    for index in _indexes(migrate_engine):
+        index.create(migrate_engine)
+
+
+def downgrade(migrate_engine):
+    for index in _indexes(migrate_engine):
+        index.drop(migrate_engine)
@@ -5,20 +5,40 @@ __author__ = "SYK"
 __date__ = "2022/8/25 下午4:04"
 
 
+from oslo_config import cfg
 from trit.core.application import Trit
 
 from account.app.example.resources import UserResource
+from account.app.user import permissions
+from account.comment import metrics
+from account.server import prefork
 from account.settings import FILE_OPTIONS
 
+CONF = cfg.CONF
+
 
 def main():
 
     app = Trit(title='account-api',
                conf_options=FILE_OPTIONS)
 
+    # Before anything is measured, and before the workers are forked.
+    metrics.setup('api', CONF.metrics.api_port)
+    metrics.instrument_resources([UserResource])
+
     app.register(resources_cls=[UserResource],
                  with_http=True)
 
+    # Build the permission index before serving so that the first
+    # requests do not pay for it.
+    permissions.get_index()
+
+    if CONF.service.api_account_launcher == 'prefork':
+        prefork.Launcher(app).run()
+        return
 
+    # 0 stands for the number of CPUs, whoever forks the workers.
+    CONF.set_override('api_account_workers', prefork.worker_count(),
+                      group='service')
     app.start(http=True)
 
@@ -0,0 +1,231 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Prefork launcher of account-api.
+
+With ``[service] api_account_launcher = prefork`` the main process imports
+and warms up what every worker needs -- the application and its routes, the
+models and their mappers, the compiled filter plans, the permission index,
+the modules account.comment imports on first use -- then forks
+``api_account_workers`` workers, as many as CPUs for 0.  The workers share
+all of it copy-on-write; gc.freeze() keeps the garbage collector from
+writing to, thus copying, those pages.
+
+Every worker accepts on its own SO_REUSEPORT socket of the API address and
+the kernel balances the connections over them.  The main process opens one
+socket per worker slot and keeps them, so the connections queued on the
+socket of a replaced worker are accepted by its successor instead of being
+reset.
+
+A worker exits after ``api_account_max_requests`` requests, plus a random
+part of ``api_account_max_requests_jitter`` so that the workers are not
+replaced all at once, and is replaced by a fresh fork of the main process.
+Workers which crash are replaced as well.  Recycled and stopped workers run
+their atexit hooks, which write what they buffered.
+
+The DB engines inherited by a worker are disposed of after the fork, see
+api._dispose_after_fork.  The workers are served by uvicorn.
+"""
+
+__author__ = "SYK"
+__date__ = "2026/10/17 下午3:40"
+
+import atexit
+import gc
+import os
+import random
+import signal
+import socket
+import time
+
+from oslo_config import cfg
+from oslo_log import log as logging
+from oslo_utils import importutils
+from sqlalchemy import orm
+
+from account.app.user import models
+from account.app.user import routers  # noqa: F401
+from account.comment import api
+from account.comment import metrics
+from account.db import models as db_models
+
+uvicorn = importutils.try_import('uvicorn')
+
+CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
+
+# Imported on first use by account.comment, before the fork here, so that
+# the workers share them instead of importing them each.
+_PRELOAD = ('passlib.hash',)
+
+# Workers exiting sooner than that after their start are replaced after a
+# pause, not to fork in a loop when they cannot start.
+_MIN_LIFETIME = 5.0
+_RESPAWN_DELAY = 1.0
+
+
+def worker_count():
+    """api_account_workers, the number of CPUs for 0."""
+    workers = CONF.service.api_account_workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+
+def _max_requests():
+    limit = CONF.service.api_account_max_requests
+    if not limit:
+        return None
+    return limit + random.randint(
+        0, CONF.service.api_account_max_requests_jitter)
+
+
+def warm():
+    """Builds what the workers would otherwise build on their first
+    requests, each on its own.
+    """
+    for name in _PRELOAD:
+        importutils.try_import(name)
+    orm.configure_mappers()
+    shapes = ('equals',) + tuple(api._LIKE_PATTERNS)
+    for mapper in models.BASE.registry.mappers:
+        model = mapper.class_
+        db_models.column_accessor(model)
+        for column in model.__table__.columns:
+            for comparator in shapes:
+                api._compile_filter_plan(
+                    model, ((column.name, comparator, False),))
+    api._cached_sort_params((), ())
+
+
+def _listen_sockets(host, port, count):
+    """One listening socket per worker slot, a single shared one where
+    SO_REUSEPORT is not supported.
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    reuse_port = hasattr(socket, 'SO_REUSEPORT')
+    if not reuse_port:
+        LOG.warning('SO_REUSEPORT is not supported, the API workers share '
+                    'one socket')
+
+    def listen():
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if reuse_port:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind((host, port))
+        sock.listen(socket.SOMAXCONN)
+        return sock
+
+    if not reuse_port:
+        return [listen()] * count
+    return [listen() for _i in range(count)]
+
+
+def _serve(app, sock, max_requests):
+    config = uvicorn.Config(app, log_config=None,
+                            access_log=CONF.service.debug,
+                            limit_max_requests=max_requests)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _worker_stop(signum, frame):
+    raise SystemExit(0)
+
+
+class Launcher(object):
+    """Forks and supervises the API workers.
+
+    :param app: the ASGI application, the Trit application itself
+    :param workers: number of workers, see :func:`worker_count` for None
+    """
+
+    def __init__(self, app, workers=None):
+        self.app = app
+        self.workers = workers or worker_count()
+        self.sockets = []
+        self.children = {}
+        self.running = False
+
+    def _spawn(self, slot):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = (slot, time.monotonic())
+            return
+        try:
+            # uvicorn raises the signal it stopped on again once stopped,
+            # which must not kill the worker before its atexit hooks.
+            signal.signal(signal.SIGTERM, _worker_stop)
+            signal.signal(signal.SIGINT, _worker_stop)
+            sock = self.sockets[slot]
+            for other in self.sockets:
+                if other is not sock:
+                    other.close()
+            _serve(self.app, sock, _max_requests())
+        except SystemExit:
+            pass
+        except BaseException:
+            LOG.exception('API worker %d failed', os.getpid())
+            os._exit(1)
+        # Recycled or stopped: the atexit hooks write the buffered user_login
+        # records and quota bills.  Not sys.exit(), the stack of the main
+        # process is still below.
+        try:
+            atexit._run_exitfuncs()
+        finally:
+            os._exit(0)
+
+    def _stop(self, signum, frame):
+        LOG.info('Stopping %d API workers', len(self.children))
+        self.running = False
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _supervise(self):
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            slot, started = self.children.pop(pid, (None, None))
+            if slot is None:
+                continue
+            metrics.process_exited(pid)
+            if not self.running:
+                continue
+            if os.WIFSIGNALED(status):
+                code = -os.WTERMSIG(status)
+            else:
+                code = os.WEXITSTATUS(status)
+            if code:
+                LOG.warning('API worker %d exited with %d, replacing it',
+                            pid, code)
+            else:
+                LOG.info('API worker %d recycled', pid)
+            if time.monotonic() - started < _MIN_LIFETIME:
+                time.sleep(_RESPAWN_DELAY)
+            self._spawn(slot)
+
+    def run(self):
+        if uvicorn is None:
+            raise RuntimeError('The prefork launcher needs uvicorn')
+        host = CONF.service.api_account_listen
+        port = CONF.service.api_account_listen_port
+        self.sockets = _listen_sockets(host, port, self.workers)
+
+        warm()
+        # Nothing to inherit, the workers connect on their own.
+        api.dispose_engine()
+        gc.collect()
+        gc.freeze()
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        LOG.info('Forking %d API workers on %s:%d', self.workers, host, port)
+        for slot in range(self.workers):
+            self._spawn(slot)
+        self._supervise()
+        for sock in set(self.sockets):
+            sock.close()
@@ -5,16 +5,23 @@ __author__ = "SYK"
 __date__ = "2022/8/25 下午4:04"
 
 
+from oslo_config import cfg
 from trit.core.application import Trit
 
 from account.app.example.resources import UserResource
+from account.comment import metrics
 from account.settings import FILE_OPTIONS
 
+CONF = cfg.CONF
+
 
 def main():
 
     app = Trit(title='account-sync',
                conf_options=FILE_OPTIONS)
 
+    # Before anything is measured, and before the workers are forked.
+    metrics.setup('sync', CONF.metrics.sync_port)
+
     app.start(sync=True)
 
@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Cold start cost of the account modules, against a regression budget.
+
+Imports every entry point of ENTRY_POINTS in fresh interpreters and reports
+the median time the import takes, on top of starting the interpreter.  The
+check fails when an import takes longer than its budget, or imports a
+module account.comment only imports on first use::
+
+    python tools/benchmarks/bench_cold_start.py --runs 10
+    python tools/benchmarks/bench_cold_start.py --budget-scale 2
+
+The budgets are about 1.5 times the import times measured when they were
+set, ``--budget-scale`` scales them for slower machines.  Where the
+time goes is shown by tools/profile_imports.py.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Modules of the API, only imported on first use.
+_LAZY_API = ('passlib', 'requests', 'webob')
+
+# module: (budget in ms, modules it must not import)
+ENTRY_POINTS = {
+    'account.comment.exception': (350, _LAZY_API),
+    # What the Celery tasks and account-sync import.
+    'account.comment.api': (900, _LAZY_API + ('fastapi',)),
+    'account.app.user.api_sqlalchemy': (1000, _LAZY_API + ('fastapi',)),
+}
+
+_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+'''
+
+
+def measure(module):
+    """Imports module in a new interpreter, returns the seconds it took
+    and the modules loaded.
+    """
+    result = subprocess.run([sys.executable, '-c', _SCRIPT % module],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    if result.returncode:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report['elapsed'], report['modules']
+
+
+def _imported(modules, names):
+    return sorted(name for name in names if name in modules or any(
+        module.startswith(name + '.') for module in modules))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-scale', type=float, default=1.0)
+    args = parser.parse_args()
+
+    failures = 0
+    for module, (budget, lazy) in ENTRY_POINTS.items():
+        budget *= args.budget_scale
+        try:
+            results = [measure(module) for _i in range(args.runs)]
+        except RuntimeError as e:
+            print('%-34s import failed: %s' % (module, e))
+            failures += 1
+            continue
+        elapsed = statistics.median(r[0] for r in results) * 1000
+        eager = _imported(results[0][1], lazy)
+        ok = elapsed <= budget and not eager
+        failures += not ok
+        print('%-34s %7.1f ms  budget %7.1f ms  %s%s'
+              % (module, elapsed, budget, 'ok' if ok else 'FAILED',
+                 '  imports %s' % ', '.join(eager) if eager else ''))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
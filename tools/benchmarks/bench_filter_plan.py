@@ -0,0 +1,79 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Per request cost of applying list hints to a query.
+
+Compares, for a typical listing of 1 to 4 filters plus sorting:
+
+* ``compile``: the filter plan is compiled on every request, like the
+  former _filter that re-inspected the model for each filter,
+* ``cached``: the plan compiled once per model and hints shape.
+
+No SQL is run, only the query is built::
+
+    python tools/benchmarks/bench_filter_plan.py --number 20000
+"""
+
+import argparse
+import timeit
+
+from sqlalchemy import orm
+
+from account.app.user import models
+from account.comment import api
+from account.comment import driver_hints
+
+
+def _hints(filters):
+    hints = driver_hints.Hints()
+    for name, value, comparator in filters:
+        hints.add_filter(name, value, comparator=comparator)
+    hints.set_sort(None, 'name', 'asc')
+    hints.set_limit(20)
+    return hints
+
+
+FILTERS = [
+    ('name', 'cpu', 'equals'),
+    ('resource', 'gpu', 'contains'),
+    ('unit', 'core', 'startswith'),
+    ('uuid', 'ab', 'endswith'),
+]
+
+
+def _uncached_filter(model, query, hints):
+    plan = api._compile_filter_plan.__wrapped__(model, hints.shape()[0])
+    remaining = []
+    for filter_, step in zip(hints.filters, plan):
+        satisfied = False
+        if step is not None:
+            query, satisfied = step(query, filter_['value'])
+        if not satisfied:
+            remaining.append(filter_)
+    hints.filters = remaining
+    return query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    model = models.Resource
+    for n in range(1, len(FILTERS) + 1):
+        filters = FILTERS[:n]
+        for label, apply_filters in (('compile', _uncached_filter),
+                                     ('cached', api._filter)):
+            def run():
+                hints = _hints(filters)
+                apply_filters(model, orm.Query(model), hints)
+
+            best = min(timeit.repeat(run, number=args.number,
+                                     repeat=args.repeat))
+            print('%-8s %d filter(s): %8.2f us/request'
+                  % (label, n, best / args.number * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""jsonutils.dumps throughput on model listings.
+
+Serializes a listing of ``--rows`` user quota rows, both as to_dict()
+dicts and as model objects, with:
+
+* ``legacy``: the generic type-by-type to_primitive,
+* ``dispatch``: the per-type handler table of to_primitive (default),
+* ``orjson``: the orjson backend, when installed.
+
+``legacy`` and ``dispatch`` must produce the same bytes::
+
+    python tools/benchmarks/bench_jsonutils.py --rows 5000
+"""
+
+import argparse
+import datetime
+import decimal
+import timeit
+import uuid
+
+from account.app.user import models
+from account.comment import jsonutils
+
+
+def _payloads(rows):
+    now = datetime.datetime(2026, 10, 17, 10, 12, 0, 123456)
+    refs = []
+    for i in range(rows):
+        refs.append(models.UserQuota(
+            id=i, created_at=now, updated_at=now,
+            total=decimal.Decimal('100.00'),
+            used=decimal.Decimal('%d.50' % (i % 100)),
+            user_uuid=uuid.UUID(int=i).hex,
+            resource_id=i % 7))
+    dicts = [dict(ref.to_dict(), uuid=uuid.UUID(int=i))
+             for i, ref in enumerate(refs)]
+    return {'dicts': dicts, 'models': refs}
+
+
+def _legacy_dumps(obj):
+    # The generic path recurses through the module level to_primitive.
+    fast = jsonutils.to_primitive
+    jsonutils.to_primitive = jsonutils._to_primitive_generic
+    try:
+        return jsonutils.json.dumps(
+            obj, default=jsonutils._to_primitive_generic)
+    finally:
+        jsonutils.to_primitive = fast
+
+
+def _backend_dumps(name):
+    def dumps(obj):
+        jsonutils.set_backend(name)
+        try:
+            return jsonutils.dumps(obj)
+        finally:
+            jsonutils.set_backend('json')
+    return dumps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    candidates = [('legacy', _legacy_dumps),
+                  ('dispatch', _backend_dumps('json'))]
+    if jsonutils.orjson is not None:
+        candidates.append(('orjson', _backend_dumps('orjson')))
+
+    print('%-8s %-10s %12s' % ('payload', 'encoder', 'rows/s'))
+    for name, payload in sorted(_payloads(args.rows).items()):
+        expected = _legacy_dumps(payload)
+        for encoder, dumps in candidates:
+            if encoder == 'dispatch':
+                assert dumps(payload) == expected, 'output differs'
+            best = min(timeit.repeat(lambda: dumps(payload), number=1,
+                                     repeat=args.repeat))
+            print('%-8s %-10s %12.0f' % (name, encoder, args.rows / best))
+
+
+if __name__ == '__main__':
+    main()
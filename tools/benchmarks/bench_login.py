@@ -0,0 +1,89 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Password verifications/s and latency of one API worker under load.
+
+``--concurrency`` coroutines of a single event loop verify passwords
+through the hashing pool for ``--duration`` seconds, like concurrent logins
+on one API worker.  Meanwhile a probe coroutine measures how late the
+event loop wakes it up, which stays near 0 as long as no hash runs on the
+loop.  Run it with the production rounds to size ``api_account_workers``
+and ``[identity] password_hash_*``::
+
+    python tools/benchmarks/bench_login.py --rounds 10000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import time
+
+from account.comment import hashing
+from account.comment import utils
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+async def _login(pool, hashed, deadline, latencies, busy):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        try:
+            ok = await pool.check_password('secret', hashed)
+        except Exception:
+            busy.append(1)
+            continue
+        assert ok
+        latencies.append(time.monotonic() - start)
+
+
+async def _probe(deadline, lags, interval=0.01):
+    while time.monotonic() < deadline:
+        start = time.monotonic()
+        await asyncio.sleep(interval)
+        lags.append(time.monotonic() - start - interval)
+
+
+async def _run(args):
+    pool = hashing.HashingPool(executor=args.executor, workers=args.workers,
+                               max_pending=args.max_pending,
+                               queue_timeout=args.queue_timeout)
+    hashed = utils.hash_password('secret', rounds=args.rounds)
+    # Start the pool before measuring.
+    await pool.check_password('secret', hashed)
+
+    latencies, busy, lags = [], [], []
+    deadline = time.monotonic() + args.duration
+    await asyncio.gather(
+        _probe(deadline, lags),
+        *[_login(pool, hashed, deadline, latencies, busy)
+          for _i in range(args.concurrency)])
+    pool.shutdown()
+
+    print('%s pool of %d, %d rounds, %d concurrent logins'
+          % (pool.executor, pool.workers, args.rounds, args.concurrency))
+    print('  %8.1f verifications/s' % (len(latencies) / args.duration))
+    print('  latency p50 %7.1f ms  p99 %7.1f ms'
+          % (_percentile(latencies, 0.5) * 1e3,
+             _percentile(latencies, 0.99) * 1e3))
+    print('  refused (busy) %d' % len(busy))
+    print('  event loop lag p99 %7.1f ms' % (_percentile(lags, 0.99) * 1e3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--executor', default='process',
+                        choices=['process', 'thread'])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=64)
+    parser.add_argument('--queue-timeout', type=float, default=5.0)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Time to first request of account-api, per launcher.
+
+Starts account-api with the configuration files given, once per run and
+launcher, and measures:
+
+* ``first``: seconds from the start of the process to the first response,
+* ``cold``: latency of that first response,
+* ``warm``: median latency of the ``--requests`` next ones.
+
+Any response counts, errors included: the server answered.  The API port
+must be free::
+
+    python tools/benchmarks/bench_startup.py \\
+        --config-file /etc/account/account.conf --runs 5 \\
+        --url http://127.0.0.1:16091/examples/
+"""
+
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+LAUNCHERS = ('trit', 'prefork')
+
+_MAIN = 'from account.server.api import main; main()'
+
+
+def _request(url):
+    """Returns the latency of a GET of url, None if nothing answered."""
+    start = time.perf_counter()
+    try:
+        urllib.request.urlopen(url, timeout=5).read()
+    except urllib.error.HTTPError:
+        pass
+    except (urllib.error.URLError, ConnectionError, OSError):
+        return None
+    return time.perf_counter() - start
+
+
+def _run(args, launcher):
+    with tempfile.NamedTemporaryFile('w', suffix='.conf') as override:
+        override.write('[service]\napi_account_launcher = %s\n'
+                       'api_account_workers = %d\n'
+                       % (launcher, args.workers))
+        override.flush()
+        command = [sys.executable, '-c', _MAIN]
+        for path in args.config_file + [override.name]:
+            command += ['--config-file', path]
+
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL,
+                                   start_new_session=True)
+        try:
+            cold = None
+            while cold is None:
+                if process.poll() is not None:
+                    raise SystemExit('account-api exited with %d'
+                                     % process.returncode)
+                if time.perf_counter() - start > args.timeout:
+                    raise SystemExit('No response after %ds' % args.timeout)
+                cold = _request(args.url)
+                if cold is None:
+                    time.sleep(0.01)
+            first = time.perf_counter() - start
+            warm = [_request(args.url) for _i in range(args.requests)]
+            warm = [latency for latency in warm if latency is not None]
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait()
+    return first, cold, statistics.median(warm) if warm else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--config-file', action='append', default=[])
+    parser.add_argument('--url', default='http://127.0.0.1:16091/examples/')
+    parser.add_argument('--launcher', choices=LAUNCHERS, action='append')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='API workers, 0 for the number of CPUs')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--timeout', type=int, default=60)
+    args = parser.parse_args()
+
+    for launcher in args.launcher or LAUNCHERS:
+        results = [_run(args, launcher) for _i in range(args.runs)]
+        first, cold, warm = (statistics.median(values)
+                             for values in zip(*results))
+        print('%-8s first %6.2f s  cold %7.2f ms  warm %7.2f ms'
+              % (launcher, first, cold * 1000, warm * 1000))
+
+
+if __name__ == '__main__':
+    main()
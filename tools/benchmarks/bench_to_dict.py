@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Rows/s of listing user_quota_bill rows as dicts.
+
+Compares, on an in-memory SQLite database:
+
+* ``orm-loop``: ORM objects turned into dicts by looping over the table
+  columns with getattr, the former to_dict,
+* ``orm``: ORM objects with the column accessor based to_dict,
+* ``rows``: api.query_to_dicts, which never builds model objects::
+
+    python tools/benchmarks/bench_to_dict.py --rows 50000
+"""
+
+import argparse
+import decimal
+import timeit
+
+import sqlalchemy
+from sqlalchemy import orm
+
+from account.app.user import models
+from account.comment import api
+
+
+def _loop_to_dict(ref):
+    d = dict()
+    for c in ref.__table__.columns:
+        d[c.name] = getattr(ref, c.name)
+    return d
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    table = models.UserQuotaBill.__table__
+    table.create(engine)
+    with engine.begin() as conn:
+        conn.execute(table.insert(), [
+            {'total_new': decimal.Decimal('1.50'), 'state': 1,
+             'user_quota_id': str(i % 1000)} for i in range(args.rows)])
+    session = orm.Session(engine)
+
+    def query():
+        session.expunge_all()
+        return session.query(models.UserQuotaBill)
+
+    candidates = [
+        ('orm-loop', lambda: [_loop_to_dict(r) for r in query().all()]),
+        ('orm', lambda: [r.to_dict() for r in query().all()]),
+        ('rows', lambda: api.query_to_dicts(models.UserQuotaBill, query())),
+    ]
+    expected = candidates[0][1]()
+    print('%-10s %12s' % ('path', 'rows/s'))
+    for name, listing in candidates:
+        assert listing() == expected, name
+        best = min(timeit.repeat(listing, number=1, repeat=args.repeat))
+        print('%-10s %12.0f' % (name, args.rows / best))
+
+
+if __name__ == '__main__':
+    main()
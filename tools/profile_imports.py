@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: UTF-8 -*-
+
+"""Import time profile of a module and of everything it imports.
+
+Imports the module in fresh interpreters with ``-X importtime`` and prints
+the modules imported by their cumulative cost, their own cost next to it,
+the best of ``--runs`` runs.  ``--tree`` prints them as a tree instead,
+each module under the one which imported it::
+
+    python tools/profile_imports.py account.server.api
+    python tools/profile_imports.py account.celery.tasks --top 40
+    python tools/profile_imports.py account.comment.exception --tree \\
+        --min-ms 2
+
+What an entry point should not import at all is checked by
+tools/benchmarks/bench_cold_start.py.
+"""
+
+import argparse
+import collections
+import re
+import subprocess
+import sys
+
+Entry = collections.namedtuple('Entry', 'name depth self_us cumulative_us')
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def profile(module):
+    """Imports module in a new interpreter, returns the entries of the
+    modules imported, in the order -X importtime reports them.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import %s' % module],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if result.returncode:
+        raise SystemExit('Importing %s failed:\n%s' % (module,
+                                                       result.stderr))
+    entries = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is not None:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append(Entry(name, (len(indent) - 1) // 2,
+                                 int(self_us), int(cumulative_us)))
+    return entries
+
+
+def best_of(module, runs):
+    """Entries of the best run of each module over runs imports."""
+    best = collections.OrderedDict()
+    for _i in range(runs):
+        for entry in profile(module):
+            known = best.get(entry.name)
+            if known is None or entry.cumulative_us < known.cumulative_us:
+                best[entry.name] = entry
+    return list(best.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('module')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--top', type=int, default=30,
+                        help='modules printed, 0 for all')
+    parser.add_argument('--prefix', default='',
+                        help='only print the modules of this package')
+    parser.add_argument('--tree', action='store_true')
+    parser.add_argument('--min-ms', type=float, default=1.0,
+                        help='modules of a lower cumulative cost are left '
+                             'out of the tree')
+    args = parser.parse_args()
+
+    entries = best_of(args.module, args.runs)
+    total = max(entry.cumulative_us for entry in entries)
+    print('%s: %.1f ms, %d modules\n' % (args.module, total / 1000.0,
+                                         len(entries)))
+    print('%10s %10s  %s' % ('cumul. ms', 'self ms', 'module'))
+    if args.tree:
+        # -X importtime reports a module once its imports are done, so
+        # its children come before it.
+        shown = [entry for entry in reversed(entries)
+                 if entry.cumulative_us >= args.min_ms * 1000 and
+                 entry.name.startswith(args.prefix)]
+        for entry in shown:
+            print('%10.1f %10.1f  %s%s' % (
+                entry.cumulative_us / 1000.0, entry.self_us / 1000.0,
+                '  ' * entry.depth, entry.name))
+        return
+    shown = sorted((entry for entry in entries
+                    if entry.name.startswith(args.prefix)),
+                   key=lambda entry: entry.cumulative_us, reverse=True)
+    for entry in shown[:args.top or None]:
+        print('%10.1f %10.1f  %s' % (entry.cumulative_us / 1000.0,
+                                     entry.self_us / 1000.0, entry.name))
+
+
+if __name__ == '__main__':
+    main()